@@ -34,6 +34,8 @@ pyinstaller --noconfirm ^
     --add-data "credentials.json;." ^
     --hidden-import "pandas" ^
     --hidden-import "openpyxl" ^
+    --hidden-import "python_calamine" ^
+    --hidden-import "xlsxwriter" ^
     --hidden-import "PIL" ^
     --hidden-import "cv2" ^
     --hidden-import "numpy" ^
@@ -45,7 +47,7 @@ pyinstaller --noconfirm ^
     --hidden-import "PySide6.QtGui" ^
     --hidden-import "PySide6.QtWidgets" ^
     --hidden-import "shiboken6" ^
-    gui_app.py
+    run_gui.py
 
 if errorlevel 1 (
     echo.
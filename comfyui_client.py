@@ -4,13 +4,16 @@ ComfyUI API Client for Image-to-Image Workflow
 """
 import os
 import json
+import threading
+import zlib
 import time
 import uuid
 import random
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlsplit
 
 # 抑制 HTTPS 自签名证书的 InsecureRequestWarning
 import urllib3
@@ -23,26 +26,27 @@ class ComfyUIClient:
     """ComfyUI API客户端，支持图生图工作流"""
     
     @classmethod
-    def from_url(cls, url: str, timeout: int = 300):
+    def from_url(cls, url: str, timeout: int = 300, pool_size: int = 10):
         """
         从完整URL创建客户端
         
         Args:
             url: 完整的ComfyUI URL，如 'https://wp08.unicorn.org.cn:37062/?__theme=dark'
             timeout: 处理超时时间
+            pool_size: 连接池大小，多线程共用同一客户端时应不小于线程数
             
         Returns:
             ComfyUIClient实例
         """
-        parsed = urlparse(url)
+        parsed = urlsplit(url)
         host = parsed.hostname or "127.0.0.1"
         port = parsed.port or (443 if parsed.scheme == 'https' else 8188)
         scheme = parsed.scheme or 'http'
         
-        client = cls(port=port, host=host, timeout=timeout, scheme=scheme)
+        client = cls(port=port, host=host, timeout=timeout, scheme=scheme, pool_size=pool_size)
         return client
     
-    def __init__(self, port: int = 8188, host: str = "127.0.0.1", timeout: int = 300, scheme: str = "http"):
+    def __init__(self, port: int = 8188, host: str = "127.0.0.1", timeout: int = 300, scheme: str = "http", pool_size: int = 10):
         """
         初始化ComfyUI客户端
         
@@ -51,6 +55,7 @@ class ComfyUIClient:
             host: ComfyUI服务主机
             timeout: 处理超时时间（秒）
             scheme: 协议 (http/https)
+            pool_size: 连接池大小
         """
         self.host = host
         self.port = port
@@ -58,6 +63,14 @@ class ComfyUIClient:
         self.scheme = scheme
         self.base_url = f"{scheme}://{host}:{port}"
         self.client_id = str(uuid.uuid4())
+        self._conn_lock = threading.Lock()
+        self._connected = False  # 最近一次 check_connection 是否成功
+        
+        # 复用 keep-alive 连接，避免每个请求重新握手 TCP/TLS
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
         
         # 加载工作流模板
         self.workflow_path = os.path.join(os.path.dirname(__file__), "workflow_i2i.json")
@@ -66,9 +79,17 @@ class ComfyUIClient:
         logger.info(f"ComfyUI客户端初始化: {self.base_url}")
     
     def check_connection(self) -> bool:
-        """检查与ComfyUI服务器的连接，HTTPS失败时自动回退HTTP"""
+        """检查与ComfyUI服务器的连接，HTTPS失败时自动回退HTTP
+
+        阶段1的线程池共用同一个客户端，回退会改写 scheme/base_url，整个检查在锁内进行。
+        """
+        with self._conn_lock:
+            self._connected = self._check_connection_locked()
+            return self._connected
+
+    def _check_connection_locked(self) -> bool:
         try:
-            response = requests.get(f"{self.base_url}/system_stats", timeout=5, verify=False)
+            response = self.session.get(f"{self.base_url}/system_stats", timeout=5, verify=False)
             return response.status_code == 200
         except requests.exceptions.SSLError:
             # HTTPS 握手失败，尝试回退到 HTTP
@@ -76,7 +97,7 @@ class ComfyUIClient:
                 fallback_url = f"http://{self.host}:{self.port}"
                 logger.info(f"HTTPS连接失败，尝试HTTP回退: {fallback_url}")
                 try:
-                    response = requests.get(f"{fallback_url}/system_stats", timeout=5)
+                    response = self.session.get(f"{fallback_url}/system_stats", timeout=5)
                     if response.status_code == 200:
                         self.scheme = "http"
                         self.base_url = fallback_url
@@ -101,7 +122,7 @@ class ComfyUIClient:
             logger.error(f"工作流加载失败: {e}")
             return None
     
-    def upload_image(self, image_path: str, subfolder: str = "", overwrite: bool = True, target_type: str = "input") -> str:
+    def upload_image(self, image_path: str, subfolder: str = "", overwrite: bool = True, target_type: str = "input", upload_name: str = None) -> str:
         """
         上传图片到ComfyUI服务器
 
@@ -110,6 +131,7 @@ class ComfyUIClient:
             subfolder: 服务器子文件夹
             overwrite: 是否覆盖同名文件
             target_type: 上传目标目录 ("input", "output", "temp")
+            upload_name: 服务器端文件名，默认使用本地文件名
 
         Returns:
             服务器端文件名，失败返回None
@@ -119,7 +141,7 @@ class ComfyUIClient:
             return None
 
         try:
-            filename = os.path.basename(image_path)
+            filename = upload_name or os.path.basename(image_path)
 
             with open(image_path, 'rb') as f:
                 files = {
@@ -131,7 +153,7 @@ class ComfyUIClient:
                     'type': target_type,
                 }
 
-                response = requests.post(
+                response = self.session.post(
                     f"{self.base_url}/upload/image",
                     files=files,
                     data=data,
@@ -361,7 +383,7 @@ class ComfyUIClient:
                 "client_id": self.client_id
             }
             
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/prompt",
                 json=payload,
                 timeout=30,
@@ -384,7 +406,7 @@ class ComfyUIClient:
     def get_history(self, prompt_id: str) -> dict:
         """获取工作流执行历史"""
         try:
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/history/{prompt_id}",
                 timeout=10,
                 verify=False
@@ -396,19 +418,26 @@ class ComfyUIClient:
             logger.debug(f"获取历史失败: {e}")
             return {}
     
-    def wait_for_completion(self, prompt_id: str) -> dict:
+    def wait_for_completion(self, prompt_id: str, cancelled=None) -> dict:
         """
         等待工作流完成
         
         Args:
             prompt_id: 工作流ID
+            cancelled: 可选回调，返回 True 时放弃等待
             
         Returns:
             输出信息字典，包含生成的图片信息
         """
         start_time = time.time()
+        # 轮询间隔从 0.2s 起逐步退避到 1s：小图很快完成时不必白等整秒
+        interval = 0.2
+        next_log = 10
         
         while time.time() - start_time < self.timeout:
+            if cancelled is not None and cancelled():
+                logger.info(f"已取消，停止等待工作流: {prompt_id}")
+                return None
             history = self.get_history(prompt_id)
             
             if prompt_id in history:
@@ -423,10 +452,12 @@ class ComfyUIClient:
                     logger.error(f"工作流执行错误: {status}")
                     return None
             
-            time.sleep(1)
+            time.sleep(interval)
+            interval = min(interval * 1.5, 1.0)
             elapsed = int(time.time() - start_time)
-            if elapsed % 10 == 0:
+            if elapsed >= next_log:
                 logger.info(f"等待工作流完成... {elapsed}s")
+                next_log = elapsed - elapsed % 10 + 10
         
         logger.error(f"工作流超时: {self.timeout}s")
         return None
@@ -451,7 +482,7 @@ class ComfyUIClient:
                 "type": img_type
             }
             
-            response = requests.get(
+            response = self.session.get(
                 f"{self.base_url}/view",
                 params=params,
                 timeout=60,
@@ -477,7 +508,7 @@ class ComfyUIClient:
             return False
     
 
-    def process_image(self, source_path: str, output_path: str, prompt_text: str = None, max_retries: int = 3) -> bool:
+    def process_image(self, source_path: str, output_path: str, prompt_text: str = None, max_retries: int = 3, cancelled=None) -> bool:
         """
         完整的图生图处理流程，带自动重试
         
@@ -486,6 +517,7 @@ class ComfyUIClient:
             output_path: 输出图片保存路径
             prompt_text: 可选的提示词
             max_retries: 最大重试次数
+            cancelled: 可选回调，返回 True 时尽快放弃（不再重试、不再下载结果）
             
         Returns:
             是否成功
@@ -494,9 +526,15 @@ class ComfyUIClient:
             if attempt > 0:
                 wait_time = 5 * attempt  # 递增等待时间
                 logger.info(f"第 {attempt + 1}/{max_retries} 次重试，等待 {wait_time} 秒...")
-                time.sleep(wait_time)
+                deadline = time.monotonic() + wait_time
+                while time.monotonic() < deadline and not (cancelled and cancelled()):
+                    time.sleep(0.2)
+            if cancelled is not None and cancelled():
+                return False
             
-            result = self._process_image_once(source_path, output_path, prompt_text)
+            # 连接已确认过时首次尝试不再重复探测；重试时总是重新确认服务可用
+            check = attempt > 0 or not self._connected
+            result = self._process_image_once(source_path, output_path, prompt_text, check=check, cancelled=cancelled)
             if result:
                 return True
             
@@ -506,17 +544,21 @@ class ComfyUIClient:
         logger.error(f"处理失败，已达到最大重试次数 ({max_retries})")
         return False
     
-    def _process_image_once(self, source_path: str, output_path: str, prompt_text: str = None) -> bool:
+    def _process_image_once(self, source_path: str, output_path: str, prompt_text: str = None, check: bool = True, cancelled=None) -> bool:
         """单次图生图处理尝试"""
         logger.info(f"开始图生图处理: {source_path}")
 
         # 1. 检查连接
-        if not self.check_connection():
+        if check and not self.check_connection():
             logger.error(f"无法连接到ComfyUI服务器: {self.base_url}")
             return False
 
         # 2. 上传图片到 input 目录（LoadImageOutput 会在 prepare 阶段被转换为 LoadImage）
-        server_filename = self.upload_image(source_path)
+        # 不同文件夹常有同名图片（如 1.jpg），并发处理时按源路径加前缀区分，
+        # 避免互相覆盖服务器上的输入图；同一源图重跑仍覆盖原文件，不会越积越多
+        path_tag = zlib.crc32(os.path.abspath(source_path).encode("utf-8"))
+        upload_name = f"{path_tag:08x}_{os.path.basename(source_path)}"
+        server_filename = self.upload_image(source_path, upload_name=upload_name)
         if not server_filename:
             return False
         
@@ -531,7 +573,7 @@ class ComfyUIClient:
             return False
         
         # 5. 等待完成
-        outputs = self.wait_for_completion(prompt_id)
+        outputs = self.wait_for_completion(prompt_id, cancelled)
         if not outputs:
             return False
         
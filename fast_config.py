@@ -0,0 +1,183 @@
+"""
+轻量 INI 解析器
+config.ini 只有扁平的 [section] key = value，用两条正则解析，
+接口与 configparser.ConfigParser 的常用子集保持一致
+"""
+
+import functools
+import re
+
+_SECTION_RE = re.compile(r"\[(?P<name>[^\]]+)\]")
+# 与 configparser 一致：key 取到第一个 = 或 : 为止
+_OPTION_RE = re.compile(r"(?P<key>.*?)\s*[=:]\s*(?P<value>.*)$")
+_INTERP_RE = re.compile(r"%\(([^)]+)\)s")
+
+_DEFAULT_SECTION = "DEFAULT"
+_UNSET = object()
+_BOOLEAN_STATES = {
+    "1": True, "yes": True, "true": True, "on": True,
+    "0": False, "no": False, "false": False, "off": False,
+}
+
+
+@functools.cache
+def _cp():
+    """只在需要抛出标准异常时才导入 configparser，启动时不加载"""
+    import configparser
+    return configparser
+
+
+class FastConfigParser:
+    """configparser.ConfigParser 的精简替代：键名不区分大小写，get 时支持 %(key)s 插值"""
+
+    def __init__(self):
+        self._defaults = {}
+        self._sections = {}  # section -> {key(小写): value}
+
+    # ---- 读取 ----
+
+    def read_string(self, text):
+        """解析 INI 文本；注释行（# / ;）忽略，缩进行视为上一个值的续行"""
+        section = None
+        key = None
+        for raw in text.splitlines():
+            line = raw.strip()
+            if not line or line[0] in "#;":
+                continue
+            if raw[0].isspace() and key is not None and section is not None:
+                section[key] += "\n" + line
+                continue
+            m = _SECTION_RE.match(line)
+            if m:
+                name = m.group("name")
+                if name == _DEFAULT_SECTION:
+                    section = self._defaults
+                else:
+                    section = self._sections.setdefault(name, {})
+                key = None
+                continue
+            m = _OPTION_RE.match(line)
+            if m and section is not None:
+                key = m.group("key").rstrip().lower()
+                section[key] = m.group("value")
+
+    def read(self, filenames, encoding=None):
+        """与 ConfigParser.read 相同：读取存在的文件，返回成功读取的路径列表"""
+        if isinstance(filenames, (str, bytes)) or hasattr(filenames, "__fspath__"):
+            filenames = [filenames]
+        read_ok = []
+        for filename in filenames:
+            try:
+                with open(filename, encoding=encoding) as f:
+                    self.read_string(f.read())
+            except OSError:
+                continue
+            read_ok.append(filename)
+        return read_ok
+
+    # ---- 查询 ----
+
+    def defaults(self):
+        return self._defaults
+
+    def sections(self):
+        return list(self._sections)
+
+    def has_section(self, section):
+        return section in self._sections
+
+    def has_option(self, section, option):
+        option = option.lower()
+        if section == _DEFAULT_SECTION:
+            return option in self._defaults
+        opts = self._sections.get(section)
+        return opts is not None and (option in opts or option in self._defaults)
+
+    def get(self, section, option, *, raw=False, fallback=_UNSET):
+        option = option.lower()
+        opts = self._sections.get(section)
+        if opts is None:
+            if fallback is _UNSET:
+                raise _cp().NoSectionError(section)
+            return fallback
+        value = opts.get(option, self._defaults.get(option))
+        if value is None:
+            if fallback is _UNSET:
+                raise _cp().NoOptionError(option, section)
+            return fallback
+        if raw or "%" not in value:
+            return value
+        return self._interpolate(section, option, value, opts)
+
+    def getint(self, section, option, *, fallback=_UNSET):
+        try:
+            return int(self.get(section, option))
+        except (_cp().NoSectionError, _cp().NoOptionError):
+            if fallback is _UNSET:
+                raise
+            return fallback
+
+    def getboolean(self, section, option, *, fallback=_UNSET):
+        try:
+            value = self.get(section, option)
+        except (_cp().NoSectionError, _cp().NoOptionError):
+            if fallback is _UNSET:
+                raise
+            return fallback
+        if value.lower() not in _BOOLEAN_STATES:
+            raise ValueError(f"Not a boolean: {value}")
+        return _BOOLEAN_STATES[value.lower()]
+
+    def items(self, section, raw=False):
+        if section not in self._sections:
+            raise _cp().NoSectionError(section)
+        merged = dict(self._defaults)
+        merged.update(self._sections[section])
+        return [(key, self.get(section, key, raw=raw)) for key in merged]
+
+    def _interpolate(self, section, option, value, opts):
+        def lookup(m):
+            name = m.group(1).lower()
+            ref = opts.get(name, self._defaults.get(name))
+            if ref is None:
+                raise _cp().InterpolationMissingOptionError(option, section, value, name)
+            return ref
+        return _INTERP_RE.sub(lookup, value).replace("%%", "%")
+
+    # ---- 修改 ----
+
+    def add_section(self, section):
+        if section == _DEFAULT_SECTION:
+            raise ValueError(f"Invalid section name: {section!r}")
+        if section in self._sections:
+            raise _cp().DuplicateSectionError(section)
+        self._sections[section] = {}
+
+    def set(self, section, option, value=None):
+        if section == _DEFAULT_SECTION:
+            opts = self._defaults
+        else:
+            opts = self._sections.get(section)
+            if opts is None:
+                raise _cp().NoSectionError(section)
+        opts[option.lower()] = value
+
+    def write(self, fp):
+        """按 ConfigParser.write 的格式输出"""
+        chunks = []
+        if self._defaults:
+            chunks.append(self._format_section(_DEFAULT_SECTION, self._defaults))
+        for name, opts in self._sections.items():
+            chunks.append(self._format_section(name, opts))
+        fp.write("".join(chunks))
+
+    @staticmethod
+    def _format_section(name, opts):
+        lines = [f"[{name}]"]
+        for key, value in opts.items():
+            if value is None:
+                lines.append(key)
+            else:
+                value = str(value).replace("\n", "\n\t")
+                lines.append(f"{key} = {value}")
+        return "\n".join(lines) + "\n\n"
@@ -10,72 +10,356 @@ GITHUB_REPO = "stokisai/wuli"
 
 import sys
 import os
+import re
+import stat
+import hashlib
+import io
+import bisect
 import math
 import shutil
 import subprocess
 import threading
+import multiprocessing
+import time
+import functools
+import json
+import queue
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlsplit
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QFileDialog, QTableWidget, QTableWidgetItem,
-    QProgressBar, QTextEdit, QFrame, QSplitter, QMessageBox,
+    QProgressBar, QPlainTextEdit, QFrame, QTableView, QSplitter, QMessageBox,
     QHeaderView, QGroupBox, QSizePolicy, QScrollArea, QCheckBox,
     QStackedWidget, QLineEdit, QFormLayout, QComboBox, QInputDialog,
     QDialog, QGridLayout, QSpinBox, QRadioButton, QButtonGroup, QDoubleSpinBox
 )
-from PySide6.QtCore import Qt, QThread, Signal, QUrl, QTimer, QObject
+from PySide6.QtCore import (
+    Qt, QThread, Signal, Slot, QUrl, QTimer, QObject, QRunnable, QThreadPool, QFileSystemWatcher,
+    QAbstractTableModel, QModelIndex
+)
 from PySide6.QtGui import QFont, QColor, QPalette, QDesktopServices, QIcon, QBrush, QTextCursor, QPixmap, QImage
 
 import cv2
 import numpy as np
 from PIL import Image
 import pandas as pd
-import configparser
 import logging
-import requests
 
 # 导入处理模块
-from image_processor import ImageProcessor, crop_image, resize_image, rotate_image
+from image_processor import crop_image, resize_image, rotate_image, init_pool_processor, process_image_in_pool
 from oss_uploader import OSSUploader
 from comfyui_client import ComfyUIClient
-from utils import setup_logging, ensure_dir
-from updater import UpdateCheckWorker, UpdateDialog
+from utils import setup_logging, ensure_dir, read_excel
+from fast_config import FastConfigParser
+from updater import UpdateChecker, UpdateDialog
+
+# 设置日志；阶段2进程池的子进程会重新导入本模块，不能再次截断 process.log
+logger = setup_logging() if multiprocessing.parent_process() is None else logging.getLogger('')
+
+# 程序目录及其下的固定路径，只计算一次
+_MODULE_DIR = Path(__file__).parent
+_CONFIG_PATH = _MODULE_DIR / "config.ini"
+_WORKFLOWS_DIR = _MODULE_DIR / "workflows"
+_QSS_PATH = _MODULE_DIR / "styles" / "dark_theme.qss"
+_UPDATE_CACHE_PATH = _MODULE_DIR / ".cache" / "update_check.json"
+_UPDATE_CACHE_TTL = 3600  # 静默更新检查复用上次结果的秒数
+_TASK_CACHE_DIR = _MODULE_DIR / ".cache" / "tasks"
+
+
+# 任务表中实际用到的列；其余列不解析，宽表也只占用这几列的内存
+_TASK_COLUMNS = frozenset({
+    'Folder Name', 'Top Text JP', 'Bottom Text JP',
+    'Top Font Size', 'Bottom Font Size', 'fonts', 'Processed image 1stage',
+})
+
+
+# 相对路径里的两种分隔符一次 translate 替换为下划线，得到 OSS 文件夹名/报告行键
+_SEP_TRANS = str.maketrans({"\\": "_", "/": "_"})
+
+
+def _read_task_excel(path):
+    """Parse the task workbook, preferring the Rust calamine engine when installed."""
+    df = read_excel(path, usecols=lambda name: str(name).strip() in _TASK_COLUMNS)
+    df.columns = [str(c).strip() for c in df.columns]
+    return df
+
+
+def _read_task_excel_cached(path):
+    """读取任务表，解析结果落盘缓存；GUI 重启后同一份未改动的 Excel 不再重新解析
+
+    缓存文件名含源路径摘要与 mtime/大小，Excel 一改动旧缓存自然失效并被清理。
+    缓存放在程序目录下，不往用户的任务表旁边写文件。
+    """
+    st = os.stat(path)
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    sidecar = _TASK_CACHE_DIR / f"{digest}.{st.st_mtime_ns}.{st.st_size}.pkl"
+    try:
+        return pd.read_pickle(sidecar)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        # 缓存损坏或由不兼容的 pandas 版本写出，重新解析即可
+        logger.debug(f"任务表缓存不可用，重新解析: {e}")
+
+    df = _read_task_excel(path)
+    try:
+        _TASK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for stale in _TASK_CACHE_DIR.glob(f"{digest}.*.pkl"):
+            stale.unlink(missing_ok=True)
+        tmp = sidecar.with_suffix(".tmp")
+        df.to_pickle(tmp)
+        os.replace(tmp, sidecar)
+    except OSError as e:
+        logger.debug(f"任务表缓存写入失败: {e}")
+    return df
+
+
+def _write_link_report(report_file, aggregator):
+    """写出横向报告: Folder Name | Image 1 | Image 2 | ...
+
+    xlsxwriter 的 constant_memory 模式逐行落盘，不再先构建整张 DataFrame；
+    未安装 xlsxwriter 时回退 pandas。
+    """
+    # 各文件夹的图片列从 Image 1 连续编号，最大列数即表头长度
+    width = max((len(links) for links in aggregator.values()), default=0)
+    columns = ["Folder Name"] + [f"Image {i}" for i in range(1, width + 1)]
+    try:
+        import xlsxwriter
+    except ImportError:
+        rows = [{"Folder Name": folder, **links} for folder, links in aggregator.items()]
+        pd.DataFrame(rows, columns=columns).to_excel(report_file, index=False)
+        return
+
+    workbook = xlsxwriter.Workbook(report_file, {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, columns)
+        for r, (folder, links) in enumerate(aggregator.items(), 1):
+            sheet.write(r, 0, folder)
+            for c, col in enumerate(columns[1:], 1):
+                link = links.get(col)
+                if link is not None:
+                    sheet.write_string(r, c, link)
+    finally:
+        workbook.close()
+
+
+def _fast_copy(src, dst):
+    """复制文件，能不搬数据就不搬: copy_file_range(可走 reflink) -> copy2
+
+    输出可能被后续流程或用户原地修改，所以不用硬链接，避免改动写回客户原图；
+    先写到目标目录下的临时文件再替换，从不以写方式打开已有的 dst。
+    """
+    try:
+        same = os.path.samefile(src, dst)
+    except OSError:
+        same = False
+    if same and os.path.normcase(os.path.abspath(src)) == os.path.normcase(os.path.abspath(dst)):
+        return
+    # dst 可能是旧版本留下的、指向原图的硬链接；下面整体替换掉它，原图不受影响
+
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        copied = False
+        if hasattr(os, "copy_file_range"):
+            try:
+                with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+                    remaining = os.fstat(fsrc.fileno()).st_size
+                    while remaining > 0:
+                        n = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                        if n == 0:
+                            break
+                        remaining -= n
+                if remaining == 0:
+                    shutil.copystat(src, tmp)
+                    copied = True
+            except OSError:
+                pass
+        if not copied:
+            shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _has_output(path):
+    """断点续跑判断: 输出文件已存在且非空"""
+    try:
+        return os.stat(path).st_size > 0
+    except OSError:
+        return False
+
+
+# 断点续跑清单（输出文件名 -> 生成它时的输入指纹），放在各阶段输出目录下
+_RESUME_MANIFEST = ".resume.json"
+
+
+def _input_signature(input_path, *settings):
+    """断点续跑指纹: 输入文件的 mtime/大小 + 影响输出的参数；任一变化都不再复用旧输出"""
+    try:
+        st = os.stat(input_path)
+        file_part = f"{st.st_mtime_ns}:{st.st_size}"
+    except (OSError, TypeError):
+        file_part = ""
+    payload = json.dumps([file_part, *settings], ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _open_local(path):
+    """用系统默认程序打开本地文件/文件夹（异步，跨平台）"""
+    QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+
+
+def _reveal_in_folder(path):
+    """打开文件所在文件夹；Windows 下用 explorer /select 选中该文件（Popen 不等待退出）"""
+    if sys.platform == "win32":
+        subprocess.Popen(['explorer', '/select,', os.path.normpath(path)], close_fds=True)
+    else:
+        _open_local(os.path.dirname(path))
+
+
+# result_added 的状态码：界面据此着色，无需再在状态文字里查找“成功/完成”
+_STATUS_OK = 0
+_STATUS_FAIL = 1
+
+# 阶段2 待渲染张数不超过该值时不启动进程池，在本进程内渲染
+_INPROCESS_RENDER_MAX = 2
+
+# 成功的图片每 N 张汇总一行日志，其余只记调试级别；失败仍逐张记录
+_SUCCESS_LOG_EVERY = 25
+
+
+def _log_success(log, count, total, name):
+    """count 为已成功张数；逐张明细在结果表里，日志只需看到推进"""
+    if count % _SUCCESS_LOG_EVERY == 0 or count == total:
+        log(f"✓ 已成功 {count}/{total} (最近: {name})")
+    else:
+        logger.debug(f"✓ {name}")
+
+
+# 副本 / copy / macOS 资源文件(._) / Office 临时文件($) 不参与处理
+_EXCLUDED_NAME_RE = re.compile(r"副本|copy|\._|^\$", re.IGNORECASE)
+
+
+def _is_excluded_image_name(name: str) -> bool:
+    """文件名命中排除规则时返回 True"""
+    return _EXCLUDED_NAME_RE.search(name) is not None
 
-# 设置日志
-logger = setup_logging()
+
+@functools.lru_cache(maxsize=1)
+def _load_qss() -> str:
+    """Read the dark theme once per process."""
+    return _QSS_PATH.read_text(encoding="utf-8")
+
+
+# ComfyUI 状态标签的 state 属性取值（与 dark_theme.qss 中 QLabel#configStatus[state=...] 对应）
+_STATE_PENDING = "pending"
+_STATE_TESTING = "testing"
+_STATE_OK = "ok"
+_STATE_ERROR = "error"
+_MSG_TEST_FIRST = "请先点击“测试连接”，连接成功后再保存为全局配置。"
+_MSG_RETEST = "地址已修改，请重新测试连接。"
+
+
+def _set_style_property(widget, name, value):
+    """设置 QSS 动态属性；值未变时跳过代价较高的 unpolish/polish"""
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+    return True
+
+
+# 已是规范形式（带 http(s):// 且无结尾斜杠）的地址原样返回
+_URL_OK_RE = re.compile(r"https?://[^/\s]+(?:/.*[^/])?")
+
+
+@functools.lru_cache(maxsize=32)
+def _normalize_url(url: str) -> str:
+    """Memoized normalization of a ComfyUI address: strip, default to http://, drop trailing '/'."""
+    clean = url.strip()
+    if _URL_OK_RE.fullmatch(clean):
+        return clean
+    if not clean:
+        return ""
+    if "://" not in clean:
+        clean = f"http://{clean}"
+    return clean.rstrip("/")
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_url(url: str):
+    """Memoized urlsplit for ComfyUI addresses typed into the config page."""
+    return urlsplit(url)
 
 
 class WorkerThread(QThread):
     """后台工作线程"""
     progress_updated = Signal(int, int, str)  # current, total, message
-    log_message = Signal(str)  # 日志消息
-    result_added = Signal(str, str, str, str)  # folder, filename, status, output_path
+    batch_started = Signal(int)  # total，每批处理开始前发出一次
+    result_added = Signal(str, str, str, str, int)  # folder, filename, status, output_path, status_code
     stage_completed = Signal(str, str, bool)  # stage_name, output_dir, success
     error_occurred = Signal(str)  # error message
-    report_saved = Signal(str)  # report file path
-    
-    def __init__(self, mode, task_file, manual_stage2_dir=None, comfyui_url=None, source_path=None, stage1_output_dir=None, workflow_path=None, parent=None):
+    report_ready = Signal(str, object)  # report file path, aggregator；由主窗口放到线程池写出
+
+    # ((绝对路径, mtime_ns), 已解析并规整列类型的任务表)；类级共享，工作线程被替换后依然有效
+    _tasks_cache = None
+
+    def __init__(self, mode, task_file, manual_stage2_dir=None, comfyui_url=None, source_path=None, stage1_output_dir=None, workflow_path=None, max_stage1_workers=2, force_rerun=False, config=None, parent=None):
         super().__init__(parent)
+        self.stage1_results = {}
+        self.stage1_output_dir = None  # Global stage1 output path from config
+        self.stage2_render_workers = os.cpu_count() or 1  # 阶段2 加文字进程数
+        self.stage2_upload_workers = 4  # 阶段2 OSS 上传并发数
+        self._oss_folder_lock = threading.Lock()
+        self._active_pools = []  # 运行中的线程/进程池，stop() 时取消其中排队的任务
+        self._last_progress_ts = 0.0
+        self.configure(mode, task_file, manual_stage2_dir, comfyui_url, source_path,
+                       stage1_output_dir, workflow_path, max_stage1_workers, force_rerun, config)
+
+    def configure(self, mode, task_file, manual_stage2_dir=None, comfyui_url=None, source_path=None, stage1_output_dir=None, workflow_path=None, max_stage1_workers=2, force_rerun=False, config=None):
+        """设置下一次运行的参数并重置单次运行状态（线程未运行时调用）"""
         self.mode = mode  # 'stage1', 'stage2', 'full_auto', 'manual_stage2'
         self.task_file = task_file
         self.manual_stage2_dir = manual_stage2_dir  # 手动阶段2的输入目录
         self.comfyui_url = comfyui_url  # 全局 ComfyUI 地址
         self.source_path = source_path  # 全局图片源路径
-        self.stage1_results = {}
-        self.stage1_output_dir = stage1_output_dir  # Global stage1 output path from config
         self.workflow_path = workflow_path  # 用户选择的工作流路径
+        self.max_stage1_workers = max_stage1_workers  # 阶段1 ComfyUI 并发数
+        self.force_rerun = force_rerun  # False 时已有输出的任务直接复用（断点续跑）
+        self.config = config  # 主窗口共享的 ConfigParser；None 时 OSSUploader 自行读取 config.ini
+        if not (mode == 'stage2' and self.stage1_results):
+            # 阶段2沿用上次阶段1的结果与输出目录，其余模式从头开始
+            self.stage1_results = {}
+            self.stage1_output_dir = stage1_output_dir
+        self._oss_folder_cache = {}  # folder_name -> OSS 前缀，同一文件夹只创建一次
         self.should_stop = False
         self.report_aggregator = {}  # {folder_name: {"Image 1": link, "Image 2": link, ...}}
         self.folder_image_counts = {}  # {folder_name: current_count}
         
     def log(self, message):
-        """发送日志消息"""
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.log_message.emit(f"[{timestamp}] {message}")
+        """记录日志；主窗口经 logging 处理器（GuiLogHandler）显示，不再单独发信号"""
         logger.info(message)
-        
+
+    def _emit_progress(self, current, total, message):
+        """进度信号限频到约 50ms 一次，最后一项总是发出"""
+        now = time.monotonic()
+        if current >= total or now - self._last_progress_ts >= 0.05:
+            self._last_progress_ts = now
+            self.progress_updated.emit(current, total, message)
+
     def run(self):
         try:
             if self.mode == 'stage1':
@@ -89,8 +373,12 @@ class WorkerThread(QThread):
             elif self.mode == 'manual_stage2':
                 self.run_manual_stage2()
         except Exception as e:
-            self.error_occurred.emit(f"处理出错: {str(e)}")
-            logger.exception("Worker thread error")
+            if self.should_stop:
+                # stop() 关闭线程池后仍在提交的任务会抛 RuntimeError，属正常取消
+                logger.info(f"工作线程已取消: {e}")
+            else:
+                self.error_occurred.emit(f"处理出错: {str(e)}")
+                logger.exception("Worker thread error")
     
     def run_stage1(self):
         """执行阶段1: ComfyUI图生图处理"""
@@ -98,7 +386,7 @@ class WorkerThread(QThread):
         
         # 读取任务文件
         try:
-            df_tasks = pd.read_excel(self.task_file)
+            df_tasks = self._load_tasks()
         except Exception as e:
             self.error_occurred.emit(f"无法读取任务文件: {e}")
             return
@@ -116,38 +404,28 @@ class WorkerThread(QThread):
             return
 
         grouped = df_tasks.groupby(['Folder Name'], sort=False)
+        # 源路径是全局的，目录只扫描一次，各分组共用同一份结果
+        folder_images = self._collect_images(source_path)
 
         for folder_name, group_df in grouped:
-            folder_images = self._collect_images(source_path)
-            task_rows = [row for _, row in group_df.iterrows()]
+            # 每行文案配置只解析一次，逐图只做字典合并
+            # to_dict('records') 免去 iterrows 逐行装箱 Series 的开销
+            row_fields = [self._materialize_row(row) for row in group_df.to_dict('records')]
+            if not row_fields:
+                row_fields = [self._materialize_row({})]
+            # 文件夹多于配置行时，多出的文件夹沿用最后一行
+            n_rows = len(row_fields)
+            last_fields = row_fields[-1]
             
             for idx, (folder_rel, images) in enumerate(folder_images):
-                for img_idx, img_path in enumerate(images):
-                    row_data = task_rows[min(idx, len(task_rows)-1)] if task_rows else {}
-                    
-                    excel_stage1_dir = None
-                    if 'Processed image 1stage' in row_data and pd.notna(row_data.get('Processed image 1stage')):
-                        excel_stage1_dir = str(row_data.get('Processed image 1stage')).strip()
-                        if excel_stage1_dir.lower() == 'nan':
-                            excel_stage1_dir = None
-
-                    task_info = {
+                fields = row_fields[idx] if idx < n_rows else last_fields
+                for img_path in images:
+                    all_tasks.append({
                         'source_path': img_path,
                         'img_name': os.path.basename(img_path),
                         'folder_rel_path': folder_rel,
-                        'stage1_dir': excel_stage1_dir,
-                        'jp_top': str(row_data.get('Top Text JP', '')) if pd.notna(row_data.get('Top Text JP')) else '',
-                        'jp_bottom': str(row_data.get('Bottom Text JP', '')) if pd.notna(row_data.get('Bottom Text JP')) else '',
-                        'top_size': int(float(row_data.get('Top Font Size', 0))) if pd.notna(row_data.get('Top Font Size')) else 0,
-                        'bottom_size': int(float(row_data.get('Bottom Font Size', 0))) if pd.notna(row_data.get('Bottom Font Size')) else 0,
-                        'font_name': str(row_data.get('fonts', '')) if pd.notna(row_data.get('fonts')) else None,
-                    }
-                    
-                    if task_info['jp_top'].lower() == 'nan': task_info['jp_top'] = ''
-                    if task_info['jp_bottom'].lower() == 'nan': task_info['jp_bottom'] = ''
-                    if task_info['stage1_dir'] and task_info['stage1_dir'].lower() == 'nan': task_info['stage1_dir'] = None
-                    
-                    all_tasks.append(task_info)
+                        **fields,
+                    })
         
         if not all_tasks:
             self.error_occurred.emit("未找到任何有效任务!")
@@ -170,11 +448,17 @@ class WorkerThread(QThread):
         if not global_stage1_dir:
             self.error_occurred.emit("Stage1 output directory is missing. Please set it in Config (legacy fallback: Excel column 'Processed image 1stage').")
             return
-        if os.path.isfile(global_stage1_dir):
+        # 一次 stat 同时判断“是文件”和“已存在”，已存在的目录无需再创建
+        try:
+            st = os.stat(global_stage1_dir)
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISREG(st.st_mode):
             self.error_occurred.emit(f"Stage1 output path is a file, not a folder: {global_stage1_dir}")
             return
         try:
-            ensure_dir(global_stage1_dir)
+            if st is None:
+                os.makedirs(global_stage1_dir, exist_ok=True)
         except Exception as e:
             self.error_occurred.emit(f"Failed to create stage1 output directory: {e}")
             return
@@ -182,10 +466,11 @@ class WorkerThread(QThread):
         self.stage1_output_dir = global_stage1_dir
         self.log(f"Output directory ({stage1_dir_from}): {global_stage1_dir}")
         self.log(f"Total tasks: {len(all_tasks)}")
+        self.batch_started.emit(len(all_tasks))
 
         # Initialize ComfyUI client
         try:
-            comfyui_client = ComfyUIClient.from_url(global_comfyui_url)
+            comfyui_client = ComfyUIClient.from_url(global_comfyui_url, pool_size=self.max_stage1_workers)
             if self.workflow_path:
                 comfyui_client.load_workflow(self.workflow_path)
                 self.log(f"✓ 已加载工作流: {os.path.basename(self.workflow_path)}")
@@ -198,76 +483,169 @@ class WorkerThread(QThread):
             self.error_occurred.emit(f"无法连接ComfyUI服务器: {e}")
             return
         
-        # 处理图片
+        # 处理图片：规则A 直接记录，规则B 并发复制，其余任务并发提交 ComfyUI
         success_count = 0
         skipped_a_count = 0
         skipped_b_count = 0
-        
-        for idx, task in enumerate(all_tasks, 1):
+        existing_count = 0
+        total = len(all_tasks)
+        done = 0
+        pending = []
+        subfolders = {}  # folder_rel_path -> 已创建的 Stage1 子文件夹
+        # 热循环里频繁用到的方法/属性先绑定为局部变量
+        log = self.log
+        emit_result = self.result_added.emit
+        emit_progress = self._emit_progress
+        results = self.stage1_results
+
+        def stage1_subfolder(folder_rel):
+            path = subfolders.get(folder_rel)
+            if path is None:
+                path = os.path.join(global_stage1_dir, folder_rel)
+                ensure_dir(path)
+                subfolders[folder_rel] = path
+            return path
+
+        # 先按规则分组: A 完全跳过，B 复制原图，其余提交 ComfyUI
+        skip_a, copy_b, to_comfy = [], [], []
+        for task in all_tasks:
+            img_stem_lower = os.path.splitext(task['img_name'].lower())[0]
+            if img_stem_lower == 'a':
+                skip_a.append(task)
+            elif img_stem_lower == 'b':
+                copy_b.append(task)
+            else:
+                to_comfy.append(task)
+
+        # 规则A: 文件名(不含扩展名)为 'a' -> 完全跳过
+        for task in skip_a:
+            emit_result(task['folder_rel_path'], task['img_name'], "跳过A", "", _STATUS_FAIL)
+        if skip_a:
+            done += len(skip_a)
+            skipped_a_count = len(skip_a)
+            emit_progress(done, total, f"跳过: {skip_a[-1]['img_name']}")
+
+        # 规则B: 文件名(不含扩展名)为 'b' -> 跳过ComfyUI，复制原图到Stage1文件夹
+        if copy_b:
             if self.should_stop:
-                self.log("用户取消操作")
+                log("用户取消操作")
                 return
-            
-            img_name_lower = task['img_name'].lower()
-            img_stem_lower = os.path.splitext(img_name_lower)[0]
-
-            # 规则A: 文件名(不含扩展名)为 'a' -> 完全跳过
-            if img_stem_lower == 'a':
-                self.progress_updated.emit(idx, len(all_tasks), f"跳过: {task['img_name']}")
-                self.log(f"⏭ ({idx}/{len(all_tasks)}) {task['img_name']} - 跳过(规则A)")
-                self.result_added.emit(task['folder_rel_path'], task['img_name'], "跳过A", "")
-                skipped_a_count += 1
-                continue
-
-            # 规则B: 文件名(不含扩展名)为 'b' -> 跳过ComfyUI，复制原图到Stage1文件夹
-            if img_stem_lower == 'b':
-                self.progress_updated.emit(idx, len(all_tasks), f"复制: {task['img_name']}")
-                # 创建Stage1子文件夹并复制原图
-                stage1_subfolder = os.path.join(global_stage1_dir, task['folder_rel_path'])
-                ensure_dir(stage1_subfolder)
-                stage1_output = os.path.join(stage1_subfolder, task['img_name'])
-                
-                try:
-                    import shutil
-                    shutil.copy2(task['source_path'], stage1_output)
-                    self.log(f"⏭ ({idx}/{len(all_tasks)}) {task['img_name']} - 跳过ComfyUI(规则B)，原图已复制到Stage1")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "跳过ComfyUI", stage1_output)
+            copies = {}
+            with ThreadPoolExecutor(max_workers=min(8, len(copy_b))) as copy_pool:
+                for task in copy_b:
+                    # 创建Stage1子文件夹并复制原图
+                    stage1_output = os.path.join(stage1_subfolder(task['folder_rel_path']), task['img_name'])
+                    copies[copy_pool.submit(_fast_copy, task['source_path'], stage1_output)] = (task, stage1_output)
+                for fut in as_completed(copies):
+                    task, stage1_output = copies[fut]
+                    done += 1
+                    emit_progress(done, total, f"复制: {task['img_name']}")
+                    try:
+                        fut.result()
+                    except Exception as copy_err:
+                        log(f"✗ ({done}/{total}) {task['img_name']} - 复制失败: {copy_err}")
+                        emit_result(task['folder_rel_path'], task['img_name'], "复制失败", "", _STATUS_FAIL)
+                        continue
+                    log(f"⏭ ({done}/{total}) {task['img_name']} - 跳过ComfyUI(规则B)，原图已复制到Stage1")
+                    emit_result(task['folder_rel_path'], task['img_name'], "跳过ComfyUI", stage1_output, _STATUS_FAIL)
                     # 使用复制后的路径
-                    self.stage1_results[task['source_path']] = {
+                    results[task['source_path']] = {
                         'output': stage1_output,
                         'task': task
                     }
                     skipped_b_count += 1
                     success_count += 1
-                except Exception as copy_err:
-                    self.log(f"✗ ({idx}/{len(all_tasks)}) {task['img_name']} - 复制失败: {copy_err}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "复制失败", "")
+
+        # 断点续跑只复用由相同源图 + 相同工作流生成的结果
+        manifest_file = os.path.join(global_stage1_dir, _RESUME_MANIFEST)
+        manifest = self._load_resume_manifest(manifest_file)
+        workflow_sig = _input_signature(self.workflow_path or comfyui_client.workflow_path)
+        signatures = {}  # stage1_output -> 本次输入指纹
+
+        for task in to_comfy:
+            if self.should_stop:
+                log("用户取消操作")
+                return
+
+            stage1_output = os.path.join(stage1_subfolder(task['folder_rel_path']), task['img_name'])
+            manifest_key = os.path.relpath(stage1_output, global_stage1_dir)
+            signature = signatures[stage1_output] = _input_signature(task['source_path'], workflow_sig)
+            if (not self.force_rerun and manifest.get(manifest_key) == signature
+                    and _has_output(stage1_output)):
+                # 断点续跑: 上次用相同输入生成的结果直接复用
+                done += 1
+                emit_progress(done, total, f"已存在: {task['img_name']}")
+                emit_result(task['folder_rel_path'], task['img_name'], "已存在", stage1_output, _STATUS_OK)
+                results[task['source_path']] = {
+                    'output': stage1_output,
+                    'task': task
+                }
+                existing_count += 1
+                success_count += 1
                 continue
-                
-            stage1_subfolder = os.path.join(global_stage1_dir, task['folder_rel_path'])
-            ensure_dir(stage1_subfolder)
-            stage1_output = os.path.join(stage1_subfolder, task['img_name'])
-            
-            self.progress_updated.emit(idx, len(all_tasks), f"{task['folder_rel_path']}/{task['img_name']}")
-            
+
+            pending.append((task, stage1_output))
+
+        if existing_count:
+            log(f"⏭ 已有阶段1结果 {existing_count} 张，跳过ComfyUI")
+        if skipped_a_count:
+            # 规则A 逐张日志合并为一行
+            log(f"⏭ 规则A 跳过 {skipped_a_count} 张")
+
+        if pending:
+            workers = max(1, min(self.max_stage1_workers, len(pending)))
+            log(f"ComfyUI 并发数: {workers}")
+            executor = ThreadPoolExecutor(max_workers=workers)
+            self._active_pools.append(executor)
+            futures = {}
+            for task, stage1_output in pending:
+                if self.should_stop:
+                    break
+                fut = executor.submit(self._process_stage1_task, comfyui_client, task, stage1_output)
+                futures[fut] = (task, stage1_output)
+
+            # 结果只在本线程中汇总与发信号，顺序由完成先后决定
             try:
-                if comfyui_client.process_image(task['source_path'], stage1_output):
-                    self.log(f"✓ ({idx}/{len(all_tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "成功", stage1_output)
-                    self.stage1_results[task['source_path']] = {
-                        'output': stage1_output,
-                        'task': task
-                    }
-                    success_count += 1
-                else:
-                    self.log(f"✗ ({idx}/{len(all_tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "失败", "")
-            except Exception as e:
-                self.log(f"✗ ({idx}/{len(all_tasks)}) {task['img_name']} - {str(e)}")
-                self.result_added.emit(task['folder_rel_path'], task['img_name'], "错误", "")
+                for fut in as_completed(futures):
+                    if self.should_stop:
+                        log("用户取消操作")
+                        return
+                    done += 1
+                    task, stage1_output = futures[fut]
+                    emit_progress(done, total, f"{task['folder_rel_path']}/{task['img_name']}")
+                    try:
+                        ok = fut.result()
+                    except Exception as e:
+                        log(f"✗ ({done}/{total}) {task['img_name']} - {str(e)}")
+                        emit_result(task['folder_rel_path'], task['img_name'], "错误", "", _STATUS_FAIL)
+                        continue
+                    if ok:
+                        manifest[os.path.relpath(stage1_output, global_stage1_dir)] = signatures[stage1_output]
+                        emit_result(task['folder_rel_path'], task['img_name'], "成功", stage1_output, _STATUS_OK)
+                        results[task['source_path']] = {
+                            'output': stage1_output,
+                            'task': task
+                        }
+                        success_count += 1
+                        _log_success(log, success_count, total, task['img_name'])
+                    else:
+                        log(f"✗ ({done}/{total}) {task['img_name']}")
+                        emit_result(task['folder_rel_path'], task['img_name'], "失败", "", _STATUS_FAIL)
+            finally:
+                self._active_pools.remove(executor)
+                # 已取消时不等待进行中的 ComfyUI 请求，它们在下一次轮询时自行放弃
+                executor.shutdown(wait=not self.should_stop, cancel_futures=True)
+                self._save_resume_manifest(manifest_file, manifest)
         
-        self.log(f"阶段1完成: {success_count}/{len(all_tasks)} 成功 (跳过A:{skipped_a_count}, 跳过ComfyUI-B:{skipped_b_count})")
+        log(f"阶段1完成: {success_count}/{len(all_tasks)} 成功 (跳过A:{skipped_a_count}, 跳过ComfyUI-B:{skipped_b_count})")
         self.stage_completed.emit("stage1", global_stage1_dir, success_count == len(all_tasks))
+
+    def _process_stage1_task(self, comfyui_client, task, stage1_output):
+        """线程池中执行单张图片的 ComfyUI 处理；已取消则直接跳过"""
+        if self.should_stop:
+            return False
+        return comfyui_client.process_image(task['source_path'], stage1_output,
+                                            cancelled=lambda: self.should_stop)
     
     def run_stage2(self):
         """执行阶段2: 添加文字标签并上传"""
@@ -277,8 +655,7 @@ class WorkerThread(QThread):
             self.error_occurred.emit("没有阶段1的处理结果！请先运行阶段1")
             return
         
-        processor = ImageProcessor()
-        uploader = OSSUploader()
+        uploader = OSSUploader(config=self.config)
         oss_enabled = uploader.authenticate()
         if oss_enabled:
             self.log("✓ 阿里云 OSS 认证成功")
@@ -286,74 +663,13 @@ class WorkerThread(QThread):
             self.log("⚠ 阿里云 OSS 认证失败，将跳过上传")
         
         tasks = list(self.stage1_results.values())
-        success_count = 0
         self.report_data = []
-        
-        for idx, item in enumerate(tasks, 1):
-            if self.should_stop:
-                self.log("用户取消操作")
-                return
-                
-            task = item['task']
-            current_img_path = item['output']
-            
-            self.progress_updated.emit(idx, len(tasks), f"{task['folder_rel_path']}/{task['img_name']}")
-            
-            # 输出路径
-            output_filename = f"{task['folder_rel_path']}_{task['img_name']}".replace(os.sep, "_")
-            temp_output_dir = "final_output"
-            ensure_dir(temp_output_dir)
-            processed_path = os.path.join(temp_output_dir, output_filename)
-            
-            result_link = ""
-            try:
-                success = processor.process_image(
-                    current_img_path, processed_path,
-                    task['jp_top'], task['jp_bottom'],
-                    top_size=task['top_size'],
-                    bottom_size=task['bottom_size'],
-                    font_name=task['font_name']
-                )
-                
-                if success:
-                    # 上传到阿里云 OSS
-                    if oss_enabled:
-                        try:
-                            # 使用清理过的文件夹名（替换反斜杠）
-                            folder_name = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
-                            oss_folder = uploader.create_folder(folder_name)
-                            self.log(f"  OSS文件夹: {oss_folder}")
-                            
-                            if oss_folder:
-                                file_obj = uploader.upload_file(processed_path, oss_folder)
-                                if file_obj:
-                                    result_link = uploader.get_direct_link(file_obj['id'])
-                                    self.log(f"  ✓ 已上传: {result_link}")
-                                else:
-                                    self.log(f"  ⚠ 上传失败")
-                            else:
-                                self.log(f"  ⚠ 创建OSS文件夹失败")
-                        except Exception as upload_err:
-                            self.log(f"  ⚠ OSS错误: {str(upload_err)}")
-                    
-                    self.log(f"✓ ({idx}/{len(tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "完成", result_link or processed_path)
-                    success_count += 1
-                else:
-                    self.log(f"✗ ({idx}/{len(tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "失败", "")
-            except Exception as e:
-                self.log(f"✗ ({idx}/{len(tasks)}) {task['img_name']} - {str(e)}")
-                self.result_added.emit(task['folder_rel_path'], task['img_name'], "错误", "")
-            
-            # 记录报告数据 - 横向格式
-            folder_key = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
-            if folder_key not in self.report_aggregator:
-                self.report_aggregator[folder_key] = {}
-                self.folder_image_counts[folder_key] = 0
-            self.folder_image_counts[folder_key] += 1
-            img_col = f"Image {self.folder_image_counts[folder_key]}"
-            self.report_aggregator[folder_key][img_col] = result_link or "Upload Failed"
+        success_count = self._run_stage2_pipeline(
+            [(item['task'], item['output']) for item in tasks],
+            uploader, oss_enabled, verbose=True
+        )
+        if success_count is None:
+            return
         
         # 保存报告
         self._save_report()
@@ -371,7 +687,7 @@ class WorkerThread(QThread):
         
         # 读取任务文件获取文案配置
         try:
-            df_tasks = pd.read_excel(self.task_file)
+            df_tasks = self._load_tasks()
         except Exception as e:
             self.error_occurred.emit(f"无法读取任务文件: {e}")
             return
@@ -382,14 +698,14 @@ class WorkerThread(QThread):
             self.error_occurred.emit(f"目录中未找到图片: {self.manual_stage2_dir}")
             return
         
-        # 获取任务配置
-        task_rows = [row for _, row in df_tasks.iterrows()]
-        if not task_rows:
+        # 获取任务配置（所有图片使用第一行配置）
+        if df_tasks.empty:
             self.error_occurred.emit("Excel中没有任务配置")
             return
+        fields = self._materialize_row(df_tasks.iloc[0])
+        fields.pop('stage1_dir', None)
         
-        processor = ImageProcessor()
-        uploader = OSSUploader()
+        uploader = OSSUploader(config=self.config)
         oss_enabled = uploader.authenticate()
         if oss_enabled:
             self.log("✓ 阿里云 OSS 认证成功")
@@ -400,153 +716,340 @@ class WorkerThread(QThread):
         all_tasks = []
         for folder_rel, images in folder_images:
             for img_path in images:
-                row_data = task_rows[0]  # 使用第一行配置
-                task_info = {
+                all_tasks.append({
                     'source_path': img_path,
                     'img_name': os.path.basename(img_path),
                     'folder_rel_path': folder_rel,
-                    'jp_top': str(row_data.get('Top Text JP', '')) if pd.notna(row_data.get('Top Text JP')) else '',
-                    'jp_bottom': str(row_data.get('Bottom Text JP', '')) if pd.notna(row_data.get('Bottom Text JP')) else '',
-                    'top_size': int(float(row_data.get('Top Font Size', 0))) if pd.notna(row_data.get('Top Font Size')) else 0,
-                    'bottom_size': int(float(row_data.get('Bottom Font Size', 0))) if pd.notna(row_data.get('Bottom Font Size')) else 0,
-                    'font_name': str(row_data.get('fonts', '')) if pd.notna(row_data.get('fonts')) else None,
-                }
-                if task_info['jp_top'].lower() == 'nan': task_info['jp_top'] = ''
-                if task_info['jp_bottom'].lower() == 'nan': task_info['jp_bottom'] = ''
-                all_tasks.append(task_info)
+                    **fields,
+                })
         
         self.log(f"找到 {len(all_tasks)} 张图片")
-        success_count = 0
         self.report_data = []
+        success_count = self._run_stage2_pipeline(
+            [(task, task['source_path']) for task in all_tasks],
+            uploader, oss_enabled
+        )
+        if success_count is None:
+            return
         
-        for idx, task in enumerate(all_tasks, 1):
-            if self.should_stop:
-                self.log("用户取消操作")
-                return
-            
-            self.progress_updated.emit(idx, len(all_tasks), f"{task['folder_rel_path']}/{task['img_name']}")
-            
-            output_filename = f"{task['folder_rel_path']}_{task['img_name']}".replace(os.sep, "_")
-            temp_output_dir = "final_output"
-            ensure_dir(temp_output_dir)
+        self._save_report()
+        self.log(f"手动阶段2完成: {success_count}/{len(all_tasks)} 成功")
+        self.stage_completed.emit("manual_stage2", os.path.abspath("final_output"), success_count == len(all_tasks))
+    
+    def _run_stage2_pipeline(self, jobs, uploader, oss_enabled, verbose=False):
+        """阶段2流水线: 进程池并行加文字（绕开 GIL），成品随完成交给上传线程池
+
+        jobs 为 [(task, 输入图片路径)]；返回成功数，用户取消时返回 None。
+        """
+        total = len(jobs)
+        self.batch_started.emit(total)
+        temp_output_dir = "final_output"
+        ensure_dir(temp_output_dir)
+        links = [""] * total  # 按任务顺序记录直链，报告列顺序与串行实现一致
+        # 每个任务的文件夹键只算一次，成品文件名、OSS 文件夹和报告行共用
+        folder_keys = [task['folder_rel_path'].translate(_SEP_TRANS) for task, _ in jobs]
+        success_count = 0
+        done = 0
+        renders = {}  # future -> (idx, task, processed_path)
+        uploads = {}
+        uploaded = queue.SimpleQueue()  # 上传线程完成时自行入队，免得每轮扫描全部上传任务
+        # 断点续跑清单: 成品文件名 -> {"sig": 输入指纹, "link": 已上传直链}；
+        # 指纹覆盖输入图与文案/字号/字体，任一变化都重新加文字并上传
+        manifest_file = os.path.join(temp_output_dir, _RESUME_MANIFEST)
+        manifest = self._load_resume_manifest(manifest_file)
+        signatures = [
+            _input_signature(img_path, task['jp_top'], task['jp_bottom'],
+                             task['top_size'], task['bottom_size'], task['font_name'])
+            for task, img_path in jobs
+        ]
+        reused = set()  # 跳过加文字的成品路径
+        to_render = []  # (idx, task, 输入图片路径, 成品路径)
+        for idx, (task, current_img_path) in enumerate(jobs, 1):
+            output_filename = f"{folder_keys[idx - 1]}_{task['img_name']}"
             processed_path = os.path.join(temp_output_dir, output_filename)
-            
-            result_link = ""
-            try:
-                success = processor.process_image(
-                    task['source_path'], processed_path,
+            record = manifest.get(output_filename)
+            if (not self.force_rerun and isinstance(record, dict)
+                    and record.get("sig") == signatures[idx - 1] and _has_output(processed_path)):
+                # 断点续跑: 成品由相同输入生成，跳过加文字
+                fut = Future()
+                fut.set_result(True)
+                renders[fut] = (idx, task, processed_path)
+                reused.add(processed_path)
+            else:
+                to_render.append((idx, task, current_img_path, processed_path))
+
+        # 进程数按实际要渲染的张数取；子进程启动要重新导入入口模块，
+        # 只有一两张时开销比渲染本身还大，直接在本进程的单线程里渲染
+        if len(to_render) > _INPROCESS_RENDER_MAX:
+            render_pool = ProcessPoolExecutor(
+                max_workers=min(self.stage2_render_workers, len(to_render)),
+                initializer=init_pool_processor
+            )
+        elif to_render:
+            render_pool = ThreadPoolExecutor(max_workers=1, initializer=init_pool_processor)
+        else:
+            render_pool = None
+        upload_pool = ThreadPoolExecutor(max_workers=self.stage2_upload_workers) if oss_enabled else None
+        self._active_pools.extend(pool for pool in (render_pool, upload_pool) if pool is not None)
+        log = self.log
+        emit_result = self.result_added.emit
+        emit_progress = self._emit_progress
+
+        def finish(idx, task, processed_path, link):
+            nonlocal success_count
+            links[idx - 1] = link
+            manifest[os.path.basename(processed_path)] = {"sig": signatures[idx - 1], "link": link}
+            emit_result(task['folder_rel_path'], task['img_name'], "完成", link or processed_path, _STATUS_OK)
+            success_count += 1
+            _log_success(log, success_count, total, task['img_name'])
+
+        def collect(futures):
+            for fut in futures:
+                idx, task, processed_path = uploads.pop(fut)
+                link, messages = fut.result()
+                for message in messages:
+                    log(message)
+                finish(idx, task, processed_path, link)
+
+        try:
+            for idx, task, current_img_path, processed_path in to_render:
+                if self.should_stop:
+                    break
+                fut = render_pool.submit(
+                    process_image_in_pool,
+                    current_img_path, processed_path,
                     task['jp_top'], task['jp_bottom'],
                     top_size=task['top_size'],
                     bottom_size=task['bottom_size'],
                     font_name=task['font_name']
                 )
-                
-                if success:
-                    if oss_enabled:
-                        try:
-                            folder_name = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
-                            oss_folder = uploader.create_folder(folder_name)
-                            if oss_folder:
-                                file_obj = uploader.upload_file(processed_path, oss_folder)
-                                if file_obj:
-                                    result_link = uploader.get_direct_link(file_obj['id'])
-                        except Exception as upload_err:
-                            self.log(f"  ⚠ OSS错误: {str(upload_err)}")
-                    
-                    self.log(f"✓ ({idx}/{len(all_tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "完成", result_link or processed_path)
-                    success_count += 1
+                renders[fut] = (idx, task, processed_path)
+
+            if self.should_stop:
+                log("用户取消操作")
+                return None
+            if reused:
+                log(f"⏭ 已有阶段2成品 {len(reused)} 张，跳过加文字")
+
+            for fut in as_completed(renders):
+                if self.should_stop:
+                    log("用户取消操作")
+                    return None
+
+                idx, task, processed_path = renders[fut]
+                done += 1
+                emit_progress(done, total, f"{task['folder_rel_path']}/{task['img_name']}")
+
+                try:
+                    success = fut.result()
+                except Exception as e:
+                    log(f"✗ ({idx}/{total}) {task['img_name']} - {str(e)}")
+                    emit_result(task['folder_rel_path'], task['img_name'], "错误", "", _STATUS_FAIL)
+                    continue
+
+                if not success:
+                    log(f"✗ ({idx}/{total}) {task['img_name']}")
+                    emit_result(task['folder_rel_path'], task['img_name'], "失败", "", _STATUS_FAIL)
+                elif processed_path in reused and manifest[os.path.basename(processed_path)].get("link"):
+                    # 成品未变且上次已上传，沿用记录的直链
+                    finish(idx, task, processed_path, manifest[os.path.basename(processed_path)]["link"])
+                elif upload_pool is None:
+                    finish(idx, task, processed_path, "")
                 else:
-                    self.log(f"✗ ({idx}/{len(all_tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "失败", "")
-            except Exception as e:
-                self.log(f"✗ ({idx}/{len(all_tasks)}) {task['img_name']} - {str(e)}")
-                self.result_added.emit(task['folder_rel_path'], task['img_name'], "错误", "")
-            
-            # 记录报告数据 - 横向格式
-            folder_key = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
+                    up = upload_pool.submit(self._upload_stage2_output, uploader, folder_keys[idx - 1], processed_path, verbose)
+                    uploads[up] = (idx, task, processed_path)
+                    up.add_done_callback(uploaded.put)
+
+                # 顺手回收已完成的上传，界面结果不必等到最后
+                while not uploaded.empty():
+                    collect([uploaded.get()])
+
+            # 剩余上传逐个收尾，期间同样响应取消
+            for up in as_completed(list(uploads)):
+                if self.should_stop:
+                    log("用户取消操作")
+                    return None
+                collect([up])
+        finally:
+            wait = not self.should_stop
+            for pool in (render_pool, upload_pool):
+                if pool is not None:
+                    self._active_pools.remove(pool)
+                    pool.shutdown(wait=wait, cancel_futures=True)
+            self._save_resume_manifest(manifest_file, manifest)
+
+        # 记录报告数据 - 横向格式
+        for folder_key, link in zip(folder_keys, links):
             if folder_key not in self.report_aggregator:
                 self.report_aggregator[folder_key] = {}
                 self.folder_image_counts[folder_key] = 0
             self.folder_image_counts[folder_key] += 1
             img_col = f"Image {self.folder_image_counts[folder_key]}"
-            self.report_aggregator[folder_key][img_col] = result_link or "Upload Failed"
-        
-        self._save_report()
-        self.log(f"手动阶段2完成: {success_count}/{len(all_tasks)} 成功")
-        self.stage_completed.emit("manual_stage2", os.path.abspath("final_output"), success_count == len(all_tasks))
-    
+            self.report_aggregator[folder_key][img_col] = link or "Upload Failed"
+        return success_count
+
+    @staticmethod
+    def _load_resume_manifest(manifest_file):
+        """读取断点续跑清单；不存在或损坏时返回空表（即全部重新处理）"""
+        try:
+            with open(manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _save_resume_manifest(self, manifest_file, manifest):
+        if not manifest:
+            return
+        # 先整体编码再一次写出；不缩进以走 json 的 C 编码器
+        data = json.dumps(manifest, ensure_ascii=False)
+        try:
+            with open(manifest_file, "w", encoding="utf-8") as f:
+                f.write(data)
+        except OSError as e:
+            self.log(f"⚠ 保存续跑记录失败: {e}")
+
+    def _get_oss_folder(self, uploader, folder_name):
+        """按文件夹名缓存 create_folder 结果；上传线程池共享，未命中时加锁创建"""
+        # 命中缓存是绝大多数情况，dict 读取本身线程安全，不必争锁
+        oss_folder = self._oss_folder_cache.get(folder_name)
+        if oss_folder is not None:
+            return oss_folder
+        with self._oss_folder_lock:
+            oss_folder = self._oss_folder_cache.get(folder_name)
+            if oss_folder is None:
+                oss_folder = uploader.create_folder(folder_name)
+                if oss_folder:
+                    self._oss_folder_cache[folder_name] = oss_folder
+        return oss_folder
+
+    def _upload_stage2_output(self, uploader, folder_name, processed_path, verbose):
+        """线程池中执行: 上传一张成品，返回 (直链, 待输出日志)；失败时直链为空串"""
+        messages = []
+        result_link = ""
+        try:
+            oss_folder = self._get_oss_folder(uploader, folder_name)
+            if verbose:
+                messages.append(f"  OSS文件夹: {oss_folder}")
+            if oss_folder:
+                file_obj = uploader.upload_file(processed_path, oss_folder)
+                if file_obj:
+                    result_link = uploader.get_direct_link(file_obj['id'])
+                    if verbose:
+                        messages.append(f"  ✓ 已上传: {result_link}")
+                elif verbose:
+                    messages.append(f"  ⚠ 上传失败")
+            elif verbose:
+                messages.append(f"  ⚠ 创建OSS文件夹失败")
+        except Exception as upload_err:
+            messages.append(f"  ⚠ OSS错误: {str(upload_err)}")
+        return result_link, messages
+
+    def _load_tasks(self):
+        """读取任务表；同一文件未修改时直接复用上次解析（含列类型规整）的结果
+
+        返回的是缓存本身，调用方只读不改。
+        """
+        key = (os.path.abspath(self.task_file), os.stat(self.task_file).st_mtime_ns)
+        cached = WorkerThread._tasks_cache
+        if cached is None or cached[0] != key:
+            df_tasks = _read_task_excel_cached(self.task_file)
+            self._coerce_task_dtypes(df_tasks)
+            cached = WorkerThread._tasks_cache = (key, df_tasks)
+        return cached[1]
+
+    @staticmethod
+    def _coerce_task_dtypes(df_tasks):
+        """按列整体规整类型：字号列转为整数（空值/非法值记为 0），文案列转为字符串（空值/'nan' 记为空串）"""
+        for col in ('Top Font Size', 'Bottom Font Size'):
+            if col in df_tasks.columns:
+                df_tasks[col] = pd.to_numeric(df_tasks[col], errors='coerce').fillna(0).astype(int)
+        for col in ('Top Text JP', 'Bottom Text JP', 'Processed image 1stage'):
+            if col in df_tasks.columns:
+                values = df_tasks[col]
+                text = values.astype(str)
+                df_tasks[col] = text.mask(values.isna() | (text.str.lower() == 'nan'), '')
+
+    @staticmethod
+    def _materialize_row(row_data):
+        """把一行（已经 _coerce_task_dtypes 规整的）任务配置转换为纯 Python 字段"""
+        font_name = row_data.get('fonts')
+        return {
+            'stage1_dir': row_data.get('Processed image 1stage', '').strip() or None,
+            'jp_top': row_data.get('Top Text JP', ''),
+            'jp_bottom': row_data.get('Bottom Text JP', ''),
+            'top_size': int(row_data.get('Top Font Size', 0)),
+            'bottom_size': int(row_data.get('Bottom Font Size', 0)),
+            'font_name': str(font_name) if pd.notna(font_name) else None,
+        }
+
     def _save_report(self):
         """保存报告到Excel - 横向格式"""
         if not self.report_aggregator:
             return
         
-        report_file = "final_report.xlsx"
-        try:
-            # 转换为横向格式: Folder Name | Image 1 | Image 2 | ...
-            final_rows = []
-            for folder_name, links_dict in self.report_aggregator.items():
-                row_dict = {"Folder Name": folder_name}
-                row_dict.update(links_dict)
-                final_rows.append(row_dict)
-            
-            df = pd.DataFrame(final_rows)
-            df.to_excel(report_file, index=False)
-            self.log(f"✓ 报告已保存: {report_file}")
-            self.report_saved.emit(os.path.abspath(report_file))
-        except Exception as e:
-            self.log(f"⚠ 保存报告失败: {e}")
+        # 写 Excel 交给主窗口的线程池，阶段完成信号不必等它；
+        # 汇总表随信号移交，下次 configure 会换新表，这里不再改动它
+        self.report_ready.emit(os.path.abspath("final_report.xlsx"), self.report_aggregator)
     
     def _collect_images(self, root_path):
         """收集文件夹中的图片"""
         folder_images = []
         valid_exts = ('.jpg', '.jpeg', '.png')
-        
-        def process_folder(folder_path):
+
+        # 显式栈做先序遍历（子目录逆序入栈），顺序与原递归实现一致；
+        # DirEntry 自带类型信息，避免逐项 isfile/isdir 的 stat。
+        # 目录不跟随符号链接：既省掉链接目标的 stat，也避免链接成环时无限遍历
+        stack = [root_path]
+        while stack:
+            folder_path = stack.pop()
+            try:
+                with os.scandir(folder_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
             images = []
             subdirs = []
-            
-            try:
-                items = sorted(os.listdir(folder_path))
-            except Exception:
-                return
-            
-            for item in items:
-                full_path = os.path.join(folder_path, item)
-                if os.path.isfile(full_path):
-                    if item.lower().endswith(valid_exts):
-                        if "副本" not in item and "copy" not in item.lower() and "._" not in item and not item.startswith("$"):
-                            images.append(full_path)
-                elif os.path.isdir(full_path):
-                    subdirs.append(full_path)
-            
+            for entry in entries:
+                name = entry.name
+                try:
+                    if entry.is_file():
+                        if name.lower().endswith(valid_exts) and not _is_excluded_image_name(name):
+                            images.append(entry.path)
+                    elif entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                except OSError:
+                    continue
+
             if images:
                 rel_folder = os.path.relpath(folder_path, root_path)
                 if rel_folder == ".":
                     rel_folder = os.path.basename(root_path)
-                folder_images.append((rel_folder, sorted(images)))
-            
-            for subdir in subdirs:
-                process_folder(subdir)
-        
-        process_folder(root_path)
+                folder_images.append((rel_folder, images))
+
+            stack.extend(reversed(subdirs))
+
         return folder_images
     
     def stop(self):
         self.should_stop = True
+        # 取消各池中尚未开始的任务；不在此等待，进行中的任务看到 should_stop 后自行收尾
+        for pool in list(self._active_pools):
+            pool.shutdown(wait=False, cancel_futures=True)
 
 
 class TemplateCompositeWorkerThread(QThread):
     """模板合成工作线程 - 将模板顶部文案条叠加到产品图上"""
     progress_updated = Signal(int, int, str)
     log_message = Signal(str)
-    result_added = Signal(str, str, str, str)  # folder, filename, status, output_path
+    result_added = Signal(str, str, str, str, int)  # folder, filename, status, output_path, status_code
     stage_completed = Signal(str, str, bool)
     error_occurred = Signal(str)
-    report_saved = Signal(str)
+    report_ready = Signal(str, object)  # report file path, aggregator
 
     def __init__(self, template_paths, product_dir, selected_order, crop_height=420,
-                 output_size=None, output_dir="template_output", banner_position="top", parent=None):
+                 output_size=None, output_dir="template_output", banner_position="top", config=None, parent=None):
         super().__init__(parent)
         self.template_paths = template_paths       # list of template image paths (ordered by user selection)
         self.product_dir = product_dir
@@ -555,6 +1058,7 @@ class TemplateCompositeWorkerThread(QThread):
         self.output_size = output_size             # (w, h) tuple or None
         self.output_dir = output_dir
         self.banner_position = banner_position     # "top" or "bottom"
+        self.config = config                       # 主窗口共享的 ConfigParser（None 时自行读取 config.ini）
         self.should_stop = False
         self.report_aggregator = {}
         self.folder_image_counts = {}
@@ -573,7 +1077,6 @@ class TemplateCompositeWorkerThread(QThread):
 
     def _detect_banner_height(self, img):
         """自动检测模板文案区域高度 - 从底部向上扫描，找到非白色内容的边界"""
-        import numpy as np
         arr = np.array(img.convert("RGB"))
         h, w, _ = arr.shape
         # 从底部向上扫描，找到包含非白色像素的行
@@ -594,8 +1097,7 @@ class TemplateCompositeWorkerThread(QThread):
 
     def _crop_banner(self, template_path):
         """裁切模板顶部文案区域 - 自动检测高度，同时返回模板原始尺寸"""
-        from PIL import Image as PILImage
-        img = PILImage.open(template_path).convert("RGBA")
+        img = Image.open(template_path).convert("RGBA")
         template_size = img.size  # 保存模板原始尺寸
         if self.crop_height > 0:
             # 手动指定高度
@@ -609,8 +1111,7 @@ class TemplateCompositeWorkerThread(QThread):
 
     def _overlay_banner(self, product_path, banner, output_path, template_size=None):
         """将文案条叠加到产品图"""
-        from PIL import Image as PILImage
-        product = PILImage.open(product_path).convert("RGBA")
+        product = Image.open(product_path).convert("RGBA")
 
         self.log(f"  [DEBUG] 产品图: {product_path}")
         self.log(f"  [DEBUG] 产品图尺寸: {product.size}, 模板尺寸: {template_size}, output_size: {self.output_size}")
@@ -632,7 +1133,7 @@ class TemplateCompositeWorkerThread(QThread):
         # 等比缩放 banner 宽度匹配画布
         if bw != canvas_w:
             new_h = int(bh * canvas_w / bw)
-            banner_resized = banner.resize((canvas_w, new_h), PILImage.LANCZOS)
+            banner_resized = banner.resize((canvas_w, new_h), Image.LANCZOS)
             self.log(f"  [DEBUG] banner缩放: {bw}x{bh} -> {canvas_w}x{new_h}")
         else:
             banner_resized = banner
@@ -647,11 +1148,11 @@ class TemplateCompositeWorkerThread(QThread):
             scale = canvas_w / pw
             new_pw = canvas_w
             new_ph = int(ph * scale)
-            product_resized = product.resize((new_pw, new_ph), PILImage.LANCZOS)
+            product_resized = product.resize((new_pw, new_ph), Image.LANCZOS)
             self.log(f"  [DEBUG] top_preserve: 产品图缩放 {pw}x{ph} -> {new_pw}x{new_ph}, 放置在 y={banner_h}")
 
             # 创建画布，先放产品图（从 banner 高度开始），底部超出部分自动裁切
-            canvas = PILImage.new("RGBA", (canvas_w, canvas_h), (255, 255, 255, 255))
+            canvas = Image.new("RGBA", (canvas_w, canvas_h), (255, 255, 255, 255))
             canvas.paste(product_resized, (0, banner_h))
             # 文案条盖在最上面
             canvas.paste(banner_resized, (0, 0), banner_resized)
@@ -661,10 +1162,10 @@ class TemplateCompositeWorkerThread(QThread):
             scale = canvas_w / pw
             new_pw = canvas_w
             new_ph = int(ph * scale)
-            product_resized = product.resize((new_pw, new_ph), PILImage.LANCZOS)
+            product_resized = product.resize((new_pw, new_ph), Image.LANCZOS)
             self.log(f"  [DEBUG] bottom_preserve: 产品图缩放 {pw}x{ph} -> {new_pw}x{new_ph}, 放置在 y=0")
 
-            canvas = PILImage.new("RGBA", (canvas_w, canvas_h), (255, 255, 255, 255))
+            canvas = Image.new("RGBA", (canvas_w, canvas_h), (255, 255, 255, 255))
             canvas.paste(product_resized, (0, 0))
             canvas.paste(banner_resized, (0, 0), banner_resized)
 
@@ -684,21 +1185,23 @@ class TemplateCompositeWorkerThread(QThread):
         def process_folder(folder_path):
             images = []
             subdirs = []
+            # scandir 的目录项自带文件类型（Windows 上无需逐项 stat）
             try:
-                items = sorted(os.listdir(folder_path))
+                with os.scandir(folder_path) as it:
+                    entries = sorted(it, key=lambda e: e.name)
             except Exception:
                 return
-            for item in items:
-                full_path = os.path.join(folder_path, item)
-                if os.path.isfile(full_path):
+            for entry in entries:
+                item = entry.name
+                if entry.is_file():
                     if item.lower().endswith(valid_exts):
-                        if "副本" not in item and "copy" not in item.lower() and "._" not in item and not item.startswith("$"):
-                            images.append(full_path)
+                        if not _is_excluded_image_name(item):
+                            images.append(entry.path)
                             logger.info(f"[COLLECT] 收录: {item}")
                         else:
                             logger.info(f"[COLLECT] 跳过(过滤规则): {item}")
-                elif os.path.isdir(full_path):
-                    subdirs.append(full_path)
+                elif entry.is_dir():
+                    subdirs.append(entry.path)
             logger.info(f"[COLLECT] 文件夹 {folder_path}: 收录 {len(images)} 张图片")
             if images:
                 rel_folder = os.path.relpath(folder_path, root_path)
@@ -753,7 +1256,7 @@ class TemplateCompositeWorkerThread(QThread):
         self.log(f"找到 {len(all_tasks)} 张产品图，开始合成")
 
         # OSS 上传
-        uploader = OSSUploader()
+        uploader = OSSUploader(config=self.config)
         oss_enabled = uploader.authenticate()
         if oss_enabled:
             self.log("✓ 阿里云 OSS 认证成功")
@@ -790,13 +1293,13 @@ class TemplateCompositeWorkerThread(QThread):
             output_path = os.path.join(sub_dir, out_name)
 
             result_link = ""
+            folder_key = task['folder_rel_path'].translate(_SEP_TRANS)
             try:
                 success = self._overlay_banner(task['source_path'], banner, output_path, template_size=tpl_size)
                 if success:
                     if oss_enabled:
                         try:
-                            folder_name = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
-                            oss_folder = uploader.create_folder(folder_name)
+                            oss_folder = uploader.create_folder(folder_key)
                             if oss_folder:
                                 file_obj = uploader.upload_file(output_path, oss_folder)
                                 if file_obj:
@@ -804,18 +1307,17 @@ class TemplateCompositeWorkerThread(QThread):
                         except Exception as upload_err:
                             self.log(f"  ⚠ OSS错误: {str(upload_err)}")
 
-                    self.log(f"✓ ({idx+1}/{len(all_tasks)}) {task['img_name']} → 模板 {tpl_name}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "完成", result_link or output_path)
+                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "完成", result_link or output_path, _STATUS_OK)
                     success_count += 1
+                    _log_success(self.log, success_count, len(all_tasks), f"{task['img_name']} → 模板 {tpl_name}")
                 else:
                     self.log(f"✗ ({idx+1}/{len(all_tasks)}) {task['img_name']}")
-                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "失败", "")
+                    self.result_added.emit(task['folder_rel_path'], task['img_name'], "失败", "", _STATUS_FAIL)
             except Exception as e:
                 self.log(f"✗ ({idx+1}/{len(all_tasks)}) {task['img_name']} - {str(e)}")
-                self.result_added.emit(task['folder_rel_path'], task['img_name'], "错误", "")
+                self.result_added.emit(task['folder_rel_path'], task['img_name'], "错误", "", _STATUS_FAIL)
 
             # 报告数据
-            folder_key = task['folder_rel_path'].replace("\\", "_").replace("/", "_")
             if folder_key not in self.report_aggregator:
                 self.report_aggregator[folder_key] = {}
                 self.folder_image_counts[folder_key] = 0
@@ -832,18 +1334,7 @@ class TemplateCompositeWorkerThread(QThread):
         if not self.report_aggregator:
             return
         report_file = os.path.join(self.output_dir, "template_report.xlsx")
-        try:
-            final_rows = []
-            for folder_name, links_dict in self.report_aggregator.items():
-                row_dict = {"Folder Name": folder_name}
-                row_dict.update(links_dict)
-                final_rows.append(row_dict)
-            df = pd.DataFrame(final_rows)
-            df.to_excel(report_file, index=False)
-            self.log(f"✓ 报告已保存: {report_file}")
-            self.report_saved.emit(os.path.abspath(report_file))
-        except Exception as e:
-            self.log(f"⚠ 保存报告失败: {e}")
+        self.report_ready.emit(os.path.abspath(report_file), self.report_aggregator)
 
     def stop(self):
         self.should_stop = True
@@ -854,14 +1345,55 @@ class LogSignalBridge(QObject):
     message = Signal(str)
 
 
+class _CachedTimeFormatter(logging.Formatter):
+    """同一秒内的日志复用已格式化的时间戳，避免每条记录都调用 strftime"""
+
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._last_time = (None, "")  # (整秒时间戳, 格式化结果)
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt is not None and datefmt != self.datefmt:
+            return super().formatTime(record, datefmt)
+        ct = int(record.created)
+        last_ct, last_s = self._last_time
+        if ct != last_ct:
+            last_s = super().formatTime(record, self.datefmt)
+            self._last_time = (ct, last_s)
+        return last_s
+
+
 class GuiLogHandler(logging.Handler):
     """Logging handler forwarding formatted logs to Qt signal."""
 
-    def __init__(self, bridge: LogSignalBridge):
+    def __init__(self, bridge: LogSignalBridge, buffer_size=None):
         super().__init__()
         self.bridge = bridge
+        # 日志面板构建前只暂存原始记录：不格式化、不发跨线程信号
+        self._pending = deque(maxlen=buffer_size)
+        self._live = False
+
+    def go_live(self):
+        """切换为实时转发，返回此前暂存记录格式化后的行"""
+        self.acquire()
+        try:
+            self._live = True
+            records = list(self._pending)
+            self._pending.clear()
+        finally:
+            self.release()
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.format(record))
+            except Exception:
+                lines.append(record.getMessage())
+        return lines
 
     def emit(self, record):
+        if not self._live:
+            self._pending.append(record)
+            return
         try:
             msg = self.format(record)
         except Exception:
@@ -888,6 +1420,157 @@ class ComfyUIConnectionTestWorker(QThread):
         except Exception as e:
             self.check_finished.emit(False, self.url, f"连接异常: {e}")
 
+
+class ClearDirWorker(QThread):
+    """后台清空目录内容的线程"""
+    clear_finished = Signal(bool, str)  # ok, error message
+
+    def __init__(self, dir_paths, file_paths, parent=None):
+        super().__init__(parent)
+        self.dir_paths = dir_paths
+        self.file_paths = file_paths
+
+    def run(self):
+        errors = []
+        # 各项互不依赖，并行删除以重叠 unlink/rmdir 系统调用的等待
+        workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(shutil.rmtree, d) for d in self.dir_paths]
+            futures += [pool.submit(os.unlink, f) for f in self.file_paths]
+            for fut in as_completed(futures):
+                exc = fut.exception()
+                if exc is not None:
+                    errors.append(str(exc))
+        if errors:
+            self.clear_finished.emit(False, errors[0])
+        else:
+            self.clear_finished.emit(True, "")
+
+
+class CopySignals(QObject):
+    """CopyRunnable 的信号载体（QRunnable 本身不是 QObject）"""
+    copy_finished = Signal(str, str)  # tag, error message
+
+
+class CopyRunnable(QRunnable):
+    """在线程池中复制单个文件"""
+
+    def __init__(self, src, dest, tag=""):
+        super().__init__()
+        self.src = src
+        self.dest = dest
+        self.tag = tag
+        self.signals = CopySignals()
+
+    def run(self):
+        try:
+            shutil.copy2(self.src, self.dest)
+        except OSError as e:
+            self.signals.copy_finished.emit(self.tag, str(e))
+            return
+        self.signals.copy_finished.emit(self.tag, "")
+
+
+class ReportSignals(QObject):
+    """ReportRunnable 的信号载体"""
+    report_saved = Signal(str)  # report file path
+
+
+class ReportRunnable(QRunnable):
+    """在线程池中写出横向链接报告，工作线程结束不必等待 Excel 序列化"""
+
+    def __init__(self, report_file, aggregator):
+        super().__init__()
+        self.report_file = report_file
+        self.aggregator = aggregator
+        self.signals = ReportSignals()
+
+    def run(self):
+        try:
+            _write_link_report(self.report_file, self.aggregator)
+        except Exception as e:
+            logger.warning(f"⚠ 保存报告失败: {e}")
+            return
+        logger.info(f"✓ 报告已保存: {self.report_file}")
+        self.signals.report_saved.emit(self.report_file)
+
+
+class ResultModel(QAbstractTableModel):
+    """结果表的数据模型: 行只存纯 Python 元组，视图只绘制可见行"""
+
+    HEADERS = ("\u5e8f\u53f7", "\u6587\u4ef6", "\u72b6\u6001", "\u8f93\u51fa/\u94fe\u63a5")
+
+    # 画刷全表共用，避免每个单元格各建一份
+    NUM_BRUSH = QBrush(QColor("#94a3b8"))
+    FILE_BRUSH = QBrush(QColor("#e2e8f0"))
+    OUTPUT_BRUSH = QBrush(QColor("#93c5fd"))
+    OK_BRUSH = QBrush(QColor("#4ade80"))
+    OK_BG_BRUSH = QBrush(QColor(34, 197, 94, 30))
+    FAIL_BRUSH = QBrush(QColor("#f87171"))
+    FAIL_BG_BRUSH = QBrush(QColor(248, 113, 113, 30))
+    # 按状态码 (_STATUS_OK, _STATUS_FAIL) 下标取色
+    STATUS_BRUSHES = (OK_BRUSH, FAIL_BRUSH)
+    STATUS_BG_BRUSHES = (OK_BG_BRUSH, FAIL_BG_BRUSH)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []  # [(文件, 状态, 输出/链接, 状态码)]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = index.row(), index.column()
+        file_text, status, output, code = self._rows[row]
+        if role == Qt.DisplayRole:
+            if col == 0:
+                return str(row + 1)
+            return (file_text, status, output)[col - 1]
+        if role == Qt.ForegroundRole:
+            if col == 0:
+                return self.NUM_BRUSH
+            if col == 1:
+                return self.FILE_BRUSH
+            if col == 2:
+                return self.STATUS_BRUSHES[code]
+            return self.OUTPUT_BRUSH
+        if role == Qt.BackgroundRole and col == 2:
+            return self.STATUS_BG_BRUSHES[code]
+        if role == Qt.TextAlignmentRole and col in (0, 2):
+            return int(Qt.AlignCenter)
+        return None
+
+    def append_row(self, folder, filename, status, output_path, status_code):
+        self.append_rows([(folder, filename, status, output_path, status_code)])
+
+    def append_rows(self, rows):
+        """一次 beginInsertRows/endInsertRows 插入一批结果"""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(
+            (f"{folder}/{filename}", status, output_path, status_code)
+            for folder, filename, status, output_path, status_code in rows
+        )
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows.clear()
+        self.endResetModel()
+
+
 class ClickableLabel(QLabel):
     """可点击的图片标签"""
     clicked = Signal(str)
@@ -1332,9 +2015,7 @@ class ImageEditorDialog(QDialog):
         self._param_stack.setCurrentIndex(idx)
         for i, btn in enumerate(self._tool_btns):
             btn.setChecked(i == idx)
-            btn.setProperty("active", "true" if i == idx else "false")
-            btn.style().unpolish(btn)
-            btn.style().polish(btn)
+            _set_style_property(btn, "active", "true" if i == idx else "false")
         h, w = self._current.shape[:2]
         self._dim_label.setText(f"当前尺寸: {w} x {h} px")
         # Update resize spinboxes to current image size
@@ -1782,6 +2463,8 @@ class ImageGalleryDialog(QDialog):
 class MainWindow(QMainWindow):
     """主窗口"""
 
+    _PULSE_LEVELS = 24  # 呼吸动画亮度档位数
+
     def __init__(self):
         super().__init__()
         self.worker = None
@@ -1789,25 +2472,76 @@ class MainWindow(QMainWindow):
         self.current_output_dir = None
         self.report_file = None
         self._update_checker = None
+        self._close_deadline = None  # 关闭窗口时等待工作线程退出的截止时间 (monotonic)
+        self._gallery_dlg = None
+        self._tpl_worker = None  # 模板页是懒加载的，closeEvent 不能依赖它已创建
+        # 以下控件在配置页首次打开时才创建，之前保持 None
+        self.comfyui_url_input = None
+        self.test_comfyui_btn = None
+        self.save_comfyui_btn = None
+        self.comfyui_status_label = None
         self._comfyui_test_worker = None
         self._comfyui_test_ok = False
         self._comfyui_tested_url = ""
+        self._comfyui_pending_test_url = ""  # 正在测试的地址；测试期间输入框被修改则清空
+        self._comfyui_tested_scheme = ""
+        self._comfyui_tested_host = ""
+        self._comfyui_tested_port = ""
+        # 地址输入框连续输入时，状态提示与按钮刷新合并为停顿 150ms 后执行一次
+        self._comfyui_url_timer = QTimer(self)
+        self._comfyui_url_timer.setSingleShot(True)
+        self._comfyui_url_timer.setInterval(150)
+        self._comfyui_url_timer.timeout.connect(self._apply_comfyui_url_changed)
         self._log_bridge = None
         self._gui_log_handler = None
         self._runtime_log_max_lines = 6000
+        self._log_queue = deque(maxlen=self._runtime_log_max_lines)
+        # 尚未写入日志面板的行，50ms 内合并为一次 appendPlainText
+        self._log_pending = deque(maxlen=self._runtime_log_max_lines)
+        self._log_flush_timer = QTimer(self)
+        self._log_flush_timer.setSingleShot(True)
+        self._log_flush_timer.setInterval(50)
+        self._log_flush_timer.timeout.connect(self._flush_log_buffer)
         self._last_progress_marker = None
         self._stage1_workflow_name = ""
         self._comfyui_glow_timer = None
         self._comfyui_glow_step = 0
+        self._clear_stage1_worker = None
+        self._clear_stage1_path = ""
+        self._message_boxes = {}
+
+        # config.ini 启动时解析一次，之后只在文件被外部修改时重新解析；保存时改内存并延迟落盘
+        self._config_path = _CONFIG_PATH
+        self._config = self._load_config()
+        self._config_flush_timer = QTimer(self)
+        self._config_flush_timer.setSingleShot(True)
+        self._config_flush_timer.setInterval(200)
+        self._config_flush_timer.timeout.connect(self._flush_config)
+        # 工作线程的结果行先攒起来，40ms 内合并插入一次
+        self._pending_rows = []
+        self._row_flush_timer = QTimer(self)
+        self._row_flush_timer.setSingleShot(True)
+        self._row_flush_timer.setInterval(40)
+        self._row_flush_timer.timeout.connect(self._flush_pending_rows)
+        self._workflows_dir = _WORKFLOWS_DIR
+        self._workflows_dir_ready = False
+        self._wf_cache_mtime = None
+        self._cached_wf_path = None
 
-        self.init_ui()
         self._init_runtime_log_capture()
-        self._load_existing_log_file()
+        self.init_ui()
         self._load_saved_task_file()
 
-        # ?????2???????
+        # 静默更新检查在窗口首次显示后再排队，不与构建和首帧绘制争抢
         self._update_check_silent = True
-        QTimer.singleShot(2000, lambda: self._check_for_updates(silent=True))
+        self._startup_update_scheduled = False
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._startup_update_scheduled:
+            self._startup_update_scheduled = True
+            QTimer.singleShot(500, lambda: self._check_for_updates(silent=True))
+
     def init_ui(self):
         """Initialize UI with left sidebar navigation and right content area."""
         self.setWindowTitle(f"\u56fe\u7247\u5904\u7406\u5de5\u5177 v{APP_VERSION}")
@@ -1964,6 +2698,8 @@ class MainWindow(QMainWindow):
         self.indicator_timer = QTimer()
         self.indicator_timer.timeout.connect(self.animate_indicator)
         self._pulse_step = 0
+        self._pulse_level = None
+        self._pulse_qss_cache = {}
         self._running_btn = None
         self._btn_pulse_on = False
         # 每个按钮的呼吸灯颜色主题: (dim_bg, bright_bg, dim_border, bright_border)
@@ -1999,18 +2735,24 @@ class MainWindow(QMainWindow):
         result_label.setObjectName("sectionLabel")
         main_layout.addWidget(result_label)
 
-        self.result_table = QTableWidget()
+        self._result_model = ResultModel(self)
+        self.result_table = QTableView()
         self.result_table.setObjectName("resultTable")
-        self.result_table.setColumnCount(4)
-        self.result_table.setHorizontalHeaderLabels(["\u5e8f\u53f7", "\u6587\u4ef6", "\u72b6\u6001", "\u8f93\u51fa/\u94fe\u63a5"])
+        self.result_table.setModel(self._result_model)
         self.result_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Fixed)
         self.result_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
         self.result_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.Fixed)
         self.result_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.Stretch)
         self.result_table.setColumnWidth(0, 50)
         self.result_table.setColumnWidth(2, 70)
-        self.result_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.result_table.setSelectionBehavior(QTableView.SelectRows)
         self.result_table.verticalHeader().setVisible(False)
+        # 固定行高，视图无需逐行测量
+        self.result_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.result_table.verticalHeader().setDefaultSectionSize(28)
+        # 行高统一，按行滚动、不折行，布局时无需逐行测量单元格
+        self.result_table.setVerticalScrollMode(QTableView.ScrollPerItem)
+        self.result_table.setWordWrap(False)
         main_layout.addWidget(self.result_table, 1)
 
         self.complete_frame = QFrame()
@@ -2070,9 +2812,28 @@ class MainWindow(QMainWindow):
 
         main_layout.addWidget(self.complete_frame)
 
-        info_page = QWidget()
-        info_page.setObjectName("infoPage")
-        info_layout = QVBoxLayout(info_page)
+        # 配置页首次切换时再构建，加快启动
+        self._info_page = QWidget()
+        self._info_page.setObjectName("infoPage")
+        self._info_page_built = False
+
+        # ========== 模板合成页面 ==========
+        # 同样延迟到首次切换时构建（模板缩略图加载较重）
+        self._template_host = QWidget()
+        template_host_layout = QVBoxLayout(self._template_host)
+        template_host_layout.setContentsMargins(0, 0, 0, 0)
+        self._template_page_built = False
+
+        self.page_stack.addWidget(tool_page)
+        self.page_stack.addWidget(self._template_host)
+        self.page_stack.addWidget(self._info_page)
+
+        self.apply_styles()
+        self.switch_page(0)
+
+    def _build_info_page(self):
+        """Build config page widgets on first use."""
+        info_layout = QVBoxLayout(self._info_page)
         info_layout.setContentsMargins(24, 24, 24, 24)
         info_layout.setSpacing(10)
 
@@ -2098,12 +2859,9 @@ class MainWindow(QMainWindow):
 
         # 读取 config.ini 已保存的值（无保存则留空）
         _, parser = self._read_runtime_config()
-        saved_host = parser.get("ComfyUI", "Host", fallback="")
-        saved_port = parser.get("ComfyUI", "DefaultPort", fallback="")
-        saved_scheme = parser.get("ComfyUI", "Scheme", fallback="")
-        if saved_host and saved_port:
-            scheme = saved_scheme if saved_scheme in ("http", "https") else ("https" if saved_port in ("443",) else "http")
-            self.comfyui_url_input.setText(f"{scheme}://{saved_host}:{saved_port}")
+        saved_url = self._saved_comfyui_url(parser)
+        if saved_url:
+            self.comfyui_url_input.setText(saved_url)
         comfyui_form.addWidget(self.comfyui_url_input, 1)
 
         self.test_comfyui_btn = QPushButton("测试连接")
@@ -2121,14 +2879,33 @@ class MainWindow(QMainWindow):
         self.save_comfyui_btn.clicked.connect(self._save_comfyui_url)
         comfyui_form.addWidget(self.save_comfyui_btn)
 
+        workers_label = QLabel("并发:")
+        workers_label.setObjectName("configLabel")
+        comfyui_form.addWidget(workers_label)
+
+        self.stage1_workers_spin = QSpinBox()
+        self.stage1_workers_spin.setObjectName("configInput")
+        self.stage1_workers_spin.setMinimumHeight(36)
+        self.stage1_workers_spin.setRange(1, 8)
+        self.stage1_workers_spin.setToolTip("阶段1同时提交给 ComfyUI 的图片数量")
+        self.stage1_workers_spin.setValue(self._saved_stage1_workers(parser))
+        self.stage1_workers_spin.valueChanged.connect(self._save_stage1_workers)
+        comfyui_form.addWidget(self.stage1_workers_spin)
+
+        self.force_rerun_check = QCheckBox("重跑已有结果")
+        self.force_rerun_check.setToolTip("不勾选时，源图、工作流、文案/字号/字体均未变化的已有输出直接复用（断点续跑）")
+        self.force_rerun_check.setChecked(parser.getboolean("Processing", "ForceRerun", fallback=False))
+        self.force_rerun_check.toggled.connect(self._save_force_rerun)
+        comfyui_form.addWidget(self.force_rerun_check)
+
         self.comfyui_status_label = QLabel("")
         self.comfyui_status_label.setObjectName("configStatus")
         self.comfyui_status_label.setWordWrap(True)
-        self.comfyui_status_label.setProperty("state", "pending")
+        self.comfyui_status_label.setProperty("state", _STATE_PENDING)
 
         info_layout.addWidget(comfyui_group)
         info_layout.addWidget(self.comfyui_status_label)
-        self._on_comfyui_url_changed(self.comfyui_url_input.text())
+        self._apply_comfyui_url_changed()
         
         info_layout.addSpacing(10)
 
@@ -2147,10 +2924,13 @@ class MainWindow(QMainWindow):
         self.workflow_combo.setMinimumHeight(36)
         self._refresh_workflow_combo()
         # 从 config.ini 恢复上次选择
-        saved_wf = parser.get("ComfyUI", "SelectedWorkflow", fallback="默认工作流")
-        idx = self.workflow_combo.findText(saved_wf)
+        idx = self.workflow_combo.findText(self._saved_workflow_name(parser))
         if idx >= 0:
             self.workflow_combo.setCurrentIndex(idx)
+        self.workflow_combo.currentIndexChanged.connect(self._invalidate_wf_path_cache)
+        # 目录有增删时由系统通知刷新，包括在程序外手动放入的工作流
+        self._wf_watcher = QFileSystemWatcher([str(self._get_workflows_dir())], self)
+        self._wf_watcher.directoryChanged.connect(self._on_workflows_dir_changed)
         workflow_form.addWidget(self.workflow_combo, 1)
 
         self.upload_workflow_btn = QPushButton("上传")
@@ -2268,43 +3048,25 @@ class MainWindow(QMainWindow):
         oss_form_layout.setSpacing(15)
         oss_form_layout.setLabelAlignment(Qt.AlignRight)
 
-        # 读取 OSS 配置
-        oss_endpoint = parser.get("OSS", "Endpoint", fallback="")
-        oss_bucket = parser.get("OSS", "Bucket", fallback="")
-        oss_key_id = parser.get("OSS", "AccessKeyId", fallback="")
-        oss_key_secret = parser.get("OSS", "AccessKeySecret", fallback="")
-        oss_prefix = parser.get("OSS", "Prefix", fallback="images/")
-
-        def create_oss_input(text, placeholder="", is_password=False):
-            inp = QLineEdit(text)
+        # 读取 OSS 配置并逐行生成输入框: (属性名, 标签, 配置键, 默认值, 占位提示, 是否密码)
+        oss_fields = (
+            ("oss_endpoint_input", "Endpoint:", "Endpoint", "", "例: oss-cn-hongkong.aliyuncs.com", False),
+            ("oss_bucket_input", "Bucket:", "Bucket", "", "例: my-bucket-name", False),
+            ("oss_key_input", "AccessKeyId:", "AccessKeyId", "", "阿里云 AccessKey ID", False),
+            ("oss_secret_input", "AccessKeySecret:", "AccessKeySecret", "", "阿里云 AccessKey Secret", True),
+            ("oss_prefix_input", "路径前缀:", "Prefix", "images/", "例: images/", False),
+        )
+        for attr, label_text, key, default, placeholder, is_password in oss_fields:
+            inp = QLineEdit(parser.get("OSS", key, fallback=default))
             inp.setObjectName("configInput")
             inp.setMinimumHeight(32)
-            if placeholder:
-                inp.setPlaceholderText(placeholder)
+            inp.setPlaceholderText(placeholder)
             if is_password:
                 inp.setEchoMode(QLineEdit.Password)
-            return inp
-
-        self.oss_endpoint_input = create_oss_input(oss_endpoint, "例: oss-cn-hongkong.aliyuncs.com")
-        oss_form_layout.addRow("Endpoint:", self.oss_endpoint_input)
-
-        self.oss_bucket_input = create_oss_input(oss_bucket, "例: my-bucket-name")
-        oss_form_layout.addRow("Bucket:", self.oss_bucket_input)
-
-        self.oss_key_input = create_oss_input(oss_key_id, "阿里云 AccessKey ID")
-        oss_form_layout.addRow("AccessKeyId:", self.oss_key_input)
-
-        self.oss_secret_input = create_oss_input(oss_key_secret, "阿里云 AccessKey Secret", is_password=True)
-        oss_form_layout.addRow("AccessKeySecret:", self.oss_secret_input)
-
-        self.oss_prefix_input = create_oss_input(oss_prefix, "例: images/")
-        oss_form_layout.addRow("路径前缀:", self.oss_prefix_input)
-
-        # 调整标签样式
-        for i in range(oss_form_layout.rowCount()):
-            item = oss_form_layout.itemAt(i, QFormLayout.LabelRole)
-            if item and item.widget():
-                item.widget().setStyleSheet("font-weight: bold; color: #cbd5e1; font-size: 13px;")
+            label = QLabel(label_text)
+            label.setStyleSheet("font-weight: bold; color: #cbd5e1; font-size: 13px;")
+            oss_form_layout.addRow(label, inp)
+            setattr(self, attr, inp)
 
         # 保存 & 测试按钮
         oss_btn_layout = QHBoxLayout()
@@ -2330,10 +3092,12 @@ class MainWindow(QMainWindow):
         log_layout.setContentsMargins(12, 12, 12, 12)
         log_layout.setSpacing(8)
 
-        self.runtime_log_view = QTextEdit()
+        self.runtime_log_view = QPlainTextEdit()
         self.runtime_log_view.setObjectName("runtimeLogView")
         self.runtime_log_view.setReadOnly(True)
-        self.runtime_log_view.setLineWrapMode(QTextEdit.NoWrap)
+        self.runtime_log_view.setLineWrapMode(QPlainTextEdit.NoWrap)
+        # 超出上限时 Qt 自动丢弃最早的行，无需手动裁剪
+        self.runtime_log_view.setMaximumBlockCount(self._runtime_log_max_lines)
         self.runtime_log_view.setMinimumHeight(220)
         log_layout.addWidget(self.runtime_log_view, 1)
 
@@ -2350,41 +3114,51 @@ class MainWindow(QMainWindow):
 
         info_layout.addStretch()
 
-        # ========== 模板合成页面 ==========
-        template_page = self._build_template_page()
-
-        self.page_stack.addWidget(tool_page)
-        self.page_stack.addWidget(template_page)
-        self.page_stack.addWidget(info_page)
-
-        self.apply_styles()
-        self.switch_page(0)
+        # 首次打开配置页才读取启动日志，并取出处理器暂存的记录
+        self._load_existing_log_file()
+        self._log_queue.extend(self._gui_log_handler.go_live())
+        if self._log_queue:
+            self.runtime_log_view.setPlainText("\n".join(self._log_queue))
+            self.runtime_log_view.moveCursor(QTextCursor.End)
+
+    def _ensure_info_page(self):
+        """Build the config page if it has not been built yet."""
+        if not self._info_page_built:
+            self._info_page_built = True
+            self._build_info_page()
+
+    def _ensure_template_page(self):
+        """Build the template composite page if it has not been built yet."""
+        if not self._template_page_built:
+            self._template_page_built = True
+            self._template_host.layout().addWidget(self._build_template_page())
 
     def apply_styles(self):
         """Load dark theme from QSS file."""
-        qss_path = Path(__file__).parent / "styles" / "dark_theme.qss"
         try:
-            with open(qss_path, "r", encoding="utf-8") as f:
-                qss = f.read()
+            qss = _load_qss()
 
             app = QApplication.instance()
             if app:
-                app.setStyleSheet(qss)
+                # 已应用同一份样式表时不再触发整表重新解析
+                if app.styleSheet() != qss:
+                    app.setStyleSheet(qss)
             else:
                 self.setStyleSheet(qss)
         except Exception as e:
-            logger.warning(f"Failed to load stylesheet: {qss_path} ({e})")
+            logger.warning(f"Failed to load stylesheet: {_QSS_PATH} ({e})")
 
     def switch_page(self, index):
         """Switch content page from left navigation."""
+        if index == 1:
+            self._ensure_template_page()
+        elif index == 2:
+            self._ensure_info_page()
         self.page_stack.setCurrentIndex(index)
-        self.nav_tool_btn.setProperty("active", index == 0)
-        self.nav_template_btn.setProperty("active", index == 1)
-        self.nav_info_btn.setProperty("active", index == 2)
-        for btn in (self.nav_tool_btn, self.nav_info_btn, self.nav_template_btn):
-            btn.style().unpolish(btn)
-            btn.style().polish(btn)
-            btn.update()
+        # 只有激活状态变化的按钮才重新应用样式
+        _set_style_property(self.nav_tool_btn, "active", index == 0)
+        _set_style_property(self.nav_template_btn, "active", index == 1)
+        _set_style_property(self.nav_info_btn, "active", index == 2)
 
     def _build_template_page(self):
         """构建模板合成页面"""
@@ -2421,7 +3195,7 @@ class MainWindow(QMainWindow):
         self.tpl_folder_input.setMinimumHeight(36)
         self.tpl_folder_input.setPlaceholderText("选择模板图片所在文件夹...")
         # 默认使用内置模板文件夹
-        default_tpl_dir = str(Path(__file__).parent / "templates")
+        default_tpl_dir = str(_MODULE_DIR / "templates")
         if os.path.isdir(default_tpl_dir):
             self.tpl_folder_input.setText(default_tpl_dir)
         tpl_folder_layout.addWidget(self.tpl_folder_input, 1)
@@ -2550,7 +3324,7 @@ class MainWindow(QMainWindow):
         self.tpl_output_input.setObjectName("configInput")
         self.tpl_output_input.setMinimumHeight(36)
         self.tpl_output_input.setPlaceholderText("选择输出文件夹路径...")
-        self.tpl_output_input.setText(str(Path(__file__).parent / "template_output"))
+        self.tpl_output_input.setText(str(_MODULE_DIR / "template_output"))
         output_layout.addWidget(self.tpl_output_input, 1)
 
         browse_output_btn = QPushButton("浏览")
@@ -2589,6 +3363,10 @@ class MainWindow(QMainWindow):
         self.tpl_result_table.setHorizontalHeaderLabels(["文件夹", "文件名", "状态", "输出/链接"])
         self.tpl_result_table.horizontalHeader().setStretchLastSection(True)
         self.tpl_result_table.setMinimumHeight(100)
+        self.tpl_result_table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tpl_result_table.verticalHeader().setDefaultSectionSize(28)
+        self.tpl_result_table.setVerticalScrollMode(QTableWidget.ScrollPerItem)
+        self.tpl_result_table.setWordWrap(False)
         layout.addWidget(self.tpl_result_table, 1)
 
         # ========== 完成操作按钮 ==========
@@ -2622,7 +3400,11 @@ class MainWindow(QMainWindow):
         self._tpl_names = []       # 模板显示名
         self._tpl_checkboxes = []  # 勾选框列表
         self._tpl_selected_order = []  # 已选模板的索引列表
-        self._tpl_worker = None
+        self._tpl_pending_rows = []  # 待插入结果表的行，定时批量刷新
+        self._tpl_row_flush_timer = QTimer(self)
+        self._tpl_row_flush_timer.setSingleShot(True)
+        self._tpl_row_flush_timer.setInterval(40)
+        self._tpl_row_flush_timer.timeout.connect(self._flush_tpl_rows)
 
         # 自动加载默认模板
         if os.path.isdir(self.tpl_folder_input.text().strip()):
@@ -2651,12 +3433,12 @@ class MainWindow(QMainWindow):
     def _open_tpl_output_folder(self):
         output_dir = getattr(self, '_tpl_output_dir', '')
         if output_dir and os.path.isdir(output_dir):
-            QDesktopServices.openUrl(QUrl.fromLocalFile(output_dir))
+            _open_local(output_dir)
 
     def _open_tpl_report(self):
         report_path = getattr(self, '_tpl_report_path', None)
         if report_path and os.path.isfile(report_path):
-            QDesktopServices.openUrl(QUrl.fromLocalFile(report_path))
+            _open_local(report_path)
 
     def _load_templates(self):
         """从文件夹加载模板图片，显示缩略图卡片"""
@@ -2782,18 +3564,24 @@ class MainWindow(QMainWindow):
             return
 
         # 清空结果表
+        self._tpl_pending_rows.clear()
+        self._tpl_row_flush_timer.stop()
+        self.tpl_result_table.setUpdatesEnabled(False)
         self.tpl_result_table.setRowCount(0)
+        self.tpl_result_table.setUpdatesEnabled(True)
         self.tpl_progress_bar.setValue(0)
         self.tpl_status_label.setText("处理中...")
         self.tpl_start_btn.setEnabled(False)
 
         output_dir = self.tpl_output_input.text().strip()
         if not output_dir:
-            output_dir = str(Path(__file__).parent / "template_output")
+            output_dir = str(_MODULE_DIR / "template_output")
         self._tpl_output_dir = output_dir
         self._tpl_report_path = None
+        self.tpl_open_report_btn.setEnabled(False)
 
         banner_pos = "bottom_preserve" if self.tpl_pos_bottom.isChecked() else "top_preserve"
+        _, parser = self._read_runtime_config()
 
         self._tpl_worker = TemplateCompositeWorkerThread(
             template_paths=self._tpl_paths,
@@ -2802,13 +3590,14 @@ class MainWindow(QMainWindow):
             crop_height=0,  # 0 = 自动检测
             output_dir=output_dir,
             banner_position=banner_pos,
+            config=parser,
         )
         self._tpl_worker.progress_updated.connect(self._on_tpl_progress)
         self._tpl_worker.log_message.connect(self._on_tpl_log)
         self._tpl_worker.result_added.connect(self._on_tpl_result)
         self._tpl_worker.stage_completed.connect(self._on_tpl_completed)
         self._tpl_worker.error_occurred.connect(self._on_tpl_error)
-        self._tpl_worker.report_saved.connect(self._on_tpl_report)
+        self._tpl_worker.report_ready.connect(self._on_tpl_report_ready)
         self._tpl_worker.start()
 
     def _on_tpl_progress(self, current, total, message):
@@ -2819,21 +3608,35 @@ class MainWindow(QMainWindow):
     def _on_tpl_log(self, message):
         logger.info(message)
 
-    def _on_tpl_result(self, folder, filename, status, output_path):
-        row = self.tpl_result_table.rowCount()
-        self.tpl_result_table.insertRow(row)
-        self.tpl_result_table.setItem(row, 0, QTableWidgetItem(folder))
-        self.tpl_result_table.setItem(row, 1, QTableWidgetItem(filename))
-        status_item = QTableWidgetItem(status)
-        if status == "完成":
-            status_item.setForeground(QBrush(QColor("#4ade80")))
-        else:
-            status_item.setForeground(QBrush(QColor("#f87171")))
-        self.tpl_result_table.setItem(row, 2, status_item)
-        self.tpl_result_table.setItem(row, 3, QTableWidgetItem(output_path))
-        self.tpl_result_table.scrollToBottom()
+    def _on_tpl_result(self, folder, filename, status, output_path, status_code):
+        self._tpl_pending_rows.append((folder, filename, status, output_path, status_code))
+        if not self._tpl_row_flush_timer.isActive():
+            self._tpl_row_flush_timer.start()
+
+    def _flush_tpl_rows(self):
+        """批量插入待显示的模板结果行：暂停重绘，整批只重排和刷新一次"""
+        rows, self._tpl_pending_rows = self._tpl_pending_rows, []
+        if not rows:
+            return
+        table = self.tpl_result_table
+        table.setUpdatesEnabled(False)
+        try:
+            start = table.rowCount()
+            table.setRowCount(start + len(rows))
+            for row, (folder, filename, status, output_path, status_code) in enumerate(rows, start):
+                table.setItem(row, 0, QTableWidgetItem(folder))
+                table.setItem(row, 1, QTableWidgetItem(filename))
+                status_item = QTableWidgetItem(status)
+                status_item.setForeground(ResultModel.STATUS_BRUSHES[status_code])
+                table.setItem(row, 2, status_item)
+                table.setItem(row, 3, QTableWidgetItem(output_path))
+        finally:
+            table.setUpdatesEnabled(True)
+        table.scrollToBottom()
 
     def _on_tpl_completed(self, stage, output_dir, success):
+        self._tpl_row_flush_timer.stop()
+        self._flush_tpl_rows()
         self.tpl_start_btn.setEnabled(True)
         self._tpl_output_dir = output_dir
         self.tpl_done_frame.setVisible(True)
@@ -2846,51 +3649,134 @@ class MainWindow(QMainWindow):
         self.tpl_status_label.setText(f"错误: {message}")
         QMessageBox.critical(self, "错误", message)
 
+    @Slot(str, object)
+    def _on_tpl_report_ready(self, report_path, aggregator):
+        self._write_report_async(report_path, aggregator, self._on_tpl_report)
+
     def _on_tpl_report(self, report_path):
         self._tpl_report_path = report_path
+        self.tpl_open_report_btn.setEnabled(True)
         self.tpl_status_label.setText(f"报告已保存: {report_path}")
 
+    def _message_box(self, icon):
+        """Return a reusable QMessageBox for the given icon, built on first use."""
+        box = self._message_boxes.get(icon)
+        if box is None:
+            box = QMessageBox(icon, "", "", QMessageBox.Ok, self)
+            self._message_boxes[icon] = box
+        return box
+
+    def _warn(self, title, text):
+        """Show a warning with the shared message box."""
+        box = self._message_box(QMessageBox.Warning)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.exec()
+
+    def _info(self, title, text):
+        """Show an information message with the shared message box."""
+        box = self._message_box(QMessageBox.Information)
+        box.setWindowTitle(title)
+        box.setText(text)
+        box.exec()
+
     def _read_runtime_config(self):
-        """Read config.ini for info page display only."""
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        return config_path, parser
+        """Return the shared config.ini parser, re-parsing only if the file changed on disk."""
+        # 有未写回的修改时以内存为准，避免外部改动覆盖掉用户刚保存的设置
+        if not self._config_flush_timer.isActive() and self._config_file_mtime() != self._config_mtime_ns:
+            self._config = self._load_config()
+        return self._config_path, self._config
+
+    def _config_file_mtime(self):
+        try:
+            return os.stat(self._config_path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_config(self):
+        """Parse config.ini from a single read of the whole file."""
+        parser = FastConfigParser()
+        self._config_mtime_ns = self._config_file_mtime()
+        try:
+            parser.read_string(self._config_path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            pass
+        return parser
+
+    def _set_config(self, section, values):
+        """Apply {key: value} to one config section and schedule a write only if something changed."""
+        _, parser = self._read_runtime_config()
+        if not parser.has_section(section):
+            parser.add_section(section)
+        changed = False
+        for key, value in values.items():
+            if parser.get(section, key, raw=True, fallback=None) != value:
+                parser.set(section, key, value)
+                changed = True
+        if changed:
+            self._schedule_config_flush()
+
+    def _schedule_config_flush(self):
+        """Coalesce bursts of saves into one config.ini write."""
+        self._config_flush_timer.start()
+
+    def _write_config(self, parser):
+        """Atomically replace config.ini: write a synced temp file, then rename."""
+        tmp_path = self._config_path.with_suffix(".ini.tmp")
+        # 与 FastConfigParser 其它写出路径共用同一个序列化器，保证 config.ini 格式一致
+        buf = io.StringIO()
+        parser.write(buf)
+        data = buf.getvalue().encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._config_path)
+        # 自己写出的文件不算外部修改
+        self._config_mtime_ns = self._config_file_mtime()
+
+    def _flush_config(self):
+        """Write the in-memory config to config.ini."""
+        self._config_flush_timer.stop()
+        try:
+            self._write_config(self._config)
+        except OSError as e:
+            logger.error(f"Failed to write config: {self._config_path} ({e})")
 
     def _init_runtime_log_capture(self):
         """Attach a logging handler to stream logs into config page."""
         self._log_bridge = LogSignalBridge()
         self._log_bridge.message.connect(self._append_runtime_log)
 
-        self._gui_log_handler = GuiLogHandler(self._log_bridge)
+        self._gui_log_handler = GuiLogHandler(self._log_bridge, self._runtime_log_max_lines)
         self._gui_log_handler.setLevel(logging.DEBUG)
         self._gui_log_handler.setFormatter(
-            logging.Formatter(
+            _CachedTimeFormatter(
                 "%(asctime)s | %(levelname)-7s | %(name)s | %(message)s",
                 "%Y-%m-%d %H:%M:%S",
             )
         )
 
+        # 记下此刻 process.log 的长度：之前的内容在首次打开配置页时再读，之后的由处理器捕获
+        try:
+            self._log_file_size = os.stat(_MODULE_DIR / "process.log").st_size
+        except OSError:
+            self._log_file_size = 0
         root_logger = logging.getLogger('')
         root_logger.addHandler(self._gui_log_handler)
 
     def _load_existing_log_file(self):
         """Load existing process.log so users can inspect previous run details."""
-        if not hasattr(self, "runtime_log_view"):
-            return
-        log_path = Path(__file__).parent / "process.log"
-        if not log_path.exists():
+        if not self._log_file_size:
             return
 
         try:
-            with open(log_path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read().strip()
+            with open(_MODULE_DIR / "process.log", "rb") as f:
+                content = f.read(self._log_file_size).decode("utf-8", errors="replace").strip()
             if content:
-                self.runtime_log_view.setPlainText(content)
-                self.runtime_log_view.moveCursor(QTextCursor.End)
+                self._log_queue.extend(content.splitlines())
         except Exception as e:
-            self.runtime_log_view.append(f"[log-load-error] {e}")
+            self._log_queue.append(f"[log-load-error] {e}")
 
     def _load_saved_task_file(self):
         """从 config.ini 加载上次保存的任务文件路径"""
@@ -2905,54 +3791,60 @@ class MainWindow(QMainWindow):
 
     def _append_runtime_log(self, message: str):
         """Append one log line into runtime log panel."""
-        if not hasattr(self, "runtime_log_view"):
-            return
         if message is None:
             return
 
-        self.runtime_log_view.append(str(message).rstrip())
-
-        # Keep recent logs only to avoid unlimited memory growth.
-        content = self.runtime_log_view.toPlainText().splitlines()
-        if len(content) > self._runtime_log_max_lines:
-            content = content[-self._runtime_log_max_lines:]
-            self.runtime_log_view.setPlainText("\n".join(content))
+        line = str(message).rstrip()
+        self._log_queue.append(line)
+        if not self._info_page_built:
+            return
+        self._log_pending.append(line)
+        if not self._log_flush_timer.isActive():
+            self._log_flush_timer.start()
 
-        self.runtime_log_view.moveCursor(QTextCursor.End)
+    def _flush_log_buffer(self):
+        """把缓冲的日志行一次性写入日志面板"""
+        if not self._log_pending:
+            return
+        text = "\n".join(self._log_pending)
+        self._log_pending.clear()
+        # 用户正在往上翻看时不强行拉回底部
+        bar = self.runtime_log_view.verticalScrollBar()
+        at_bottom = bar.value() == bar.maximum()
+        self.runtime_log_view.appendPlainText(text)
+        if at_bottom:
+            bar.setValue(bar.maximum())
 
     def _copy_runtime_logs(self):
         """Copy all runtime logs with one click."""
-        if not hasattr(self, "runtime_log_view"):
+        if not self._info_page_built:
             return
 
-        text = self.runtime_log_view.toPlainText().strip()
+        # Join the live ring buffer instead of snapshotting the whole document.
+        if self._log_queue:
+            text = "\n".join(self._log_queue)
+        else:
+            text = self.runtime_log_view.toPlainText().strip()
         if not text:
-            QMessageBox.information(self, "\u63d0\u793a", "\u5f53\u524d\u6ca1\u6709\u53ef\u590d\u5236\u7684\u65e5\u5fd7\u3002")
+            self._info("\u63d0\u793a", "\u5f53\u524d\u6ca1\u6709\u53ef\u590d\u5236\u7684\u65e5\u5fd7\u3002")
             return
 
         QApplication.clipboard().setText(text)
-        QMessageBox.information(self, "\u590d\u5236\u6210\u529f", "\u65e5\u5fd7\u5df2\u590d\u5236\u5230\u526a\u8d34\u677f\u3002")
+        self._info("\u590d\u5236\u6210\u529f", "\u65e5\u5fd7\u5df2\u590d\u5236\u5230\u526a\u8d34\u677f\u3002")
 
     def _save_oss_config(self):
         """保存 OSS 配置到 config.ini"""
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        if not parser.has_section("OSS"):
-            parser.add_section("OSS")
-        parser.set("OSS", "Endpoint", self.oss_endpoint_input.text().strip())
-        parser.set("OSS", "Bucket", self.oss_bucket_input.text().strip())
-        parser.set("OSS", "AccessKeyId", self.oss_key_input.text().strip())
-        parser.set("OSS", "AccessKeySecret", self.oss_secret_input.text().strip())
-        parser.set("OSS", "Prefix", self.oss_prefix_input.text().strip())
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
-        QMessageBox.information(self, "保存成功", "OSS 配置已保存，下次处理时生效。")
+        self._set_config("OSS", {
+            "Endpoint": self.oss_endpoint_input.text().strip(),
+            "Bucket": self.oss_bucket_input.text().strip(),
+            "AccessKeyId": self.oss_key_input.text().strip(),
+            "AccessKeySecret": self.oss_secret_input.text().strip(),
+            "Prefix": self.oss_prefix_input.text().strip(),
+        })
+        self._info("保存成功", "OSS 配置已保存，下次处理时生效。")
 
     def _test_oss_connection(self):
         """测试 OSS 连接"""
-        from oss_uploader import OSSUploader
         uploader = OSSUploader.__new__(OSSUploader)
         uploader.endpoint = self.oss_endpoint_input.text().strip()
         uploader.bucket_name = self.oss_bucket_input.text().strip()
@@ -2962,9 +3854,9 @@ class MainWindow(QMainWindow):
         uploader.bucket = None
         uploader.auth = None
         if uploader.authenticate():
-            QMessageBox.information(self, "连接成功", f"OSS 连接成功!\nBucket: {uploader.bucket_name}\n链接前缀: https://{uploader.bucket_name}.{uploader.endpoint}/")
+            self._info("连接成功", f"OSS 连接成功!\nBucket: {uploader.bucket_name}\n链接前缀: https://{uploader.bucket_name}.{uploader.endpoint}/")
         else:
-            QMessageBox.warning(self, "连接失败", "OSS 连接失败，请检查配置参数是否正确。")
+            self._warn("连接失败", "OSS 连接失败，请检查配置参数是否正确。")
 
     def browse_file(self):
         """浏览并选择任务文件"""
@@ -2978,54 +3870,46 @@ class MainWindow(QMainWindow):
             self.stage1_btn.setEnabled(True)
             self.auto_btn.setEnabled(True)
             self.manual_stage2_btn.setEnabled(True)
-            self.result_table.setRowCount(0)
+            self._clear_results()
             self.complete_frame.setVisible(False)
 
     def _save_task_file_path(self):
         """保存任务文件路径到 config.ini"""
         if not self.task_file:
-            QMessageBox.warning(self, "警告", "请先选择任务文件")
-            return
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        if not parser.has_section("Paths"):
-            parser.add_section("Paths")
-        parser.set("Paths", "InputTaskFile", self.task_file)
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
-        QMessageBox.information(self, "保存成功", f"任务文件路径已保存: {self.task_file}")
+            self._warn("警告", "请先选择任务文件")
+            return
+        self._set_config("Paths", {"InputTaskFile": self.task_file})
+        self._info("保存成功", f"任务文件路径已保存: {self.task_file}")
             
     def run_stage1(self):
         """运行阶段1"""
         if not self.task_file:
-            QMessageBox.warning(self, "警告", "请先选择任务文件！")
+            self._warn("警告", "请先选择任务文件！")
             return
-        self.result_table.setRowCount(0)
+        self._clear_results()
         self.start_worker('stage1')
         
     def run_stage2(self):
         """运行阶段2"""
         if not self.worker or not self.worker.stage1_results:
-            QMessageBox.warning(self, "警告", "请先完成阶段1！")
+            self._warn("警告", "请先完成阶段1！")
             return
         self.start_worker('stage2')
         
     def run_full_auto(self):
         """运行全自动流程"""
         if not self.task_file:
-            QMessageBox.warning(self, "警告", "请先选择任务文件！")
+            self._warn("警告", "请先选择任务文件！")
             return
         if not self.check_old_report():
             return
-        self.result_table.setRowCount(0)
+        self._clear_results()
         self.start_worker('full_auto')
     
     def run_manual_stage2(self):
         """手动阶段2: 选择已有图片文件夹"""
         if not self.task_file:
-            QMessageBox.warning(self, "警告", "请先选择任务文件！")
+            self._warn("警告", "请先选择任务文件！")
             return
         
         # 提示用户
@@ -3048,26 +3932,26 @@ class MainWindow(QMainWindow):
         if folder_path:
             if not self.check_old_report():
                 return
-            self.result_table.setRowCount(0)
+            self._clear_results()
             self.start_worker('manual_stage2', folder_path)
 
     def _cleanup_old_worker(self):
-        """安全清理旧的工作线程，防止 QThread 被销毁时仍在运行导致崩溃。"""
-        if self.worker is None:
+        """停止仍在运行的工作线程；被强制终止的实例直接丢弃，其余实例下次复用。"""
+        if self.worker is None or not self.worker.isRunning():
             return
-        if self.worker.isRunning():
-            self.worker.stop()
-            if not self.worker.wait(5000):
-                logger.warning("旧工作线程 5s 内未结束，强制终止")
-                self.worker.terminate()
-                self.worker.wait(2000)
+        self.worker.stop()
+        if self.worker.wait(5000):
+            return
+        logger.warning("旧工作线程 5s 内未结束，强制终止")
+        self.worker.terminate()
+        self.worker.wait(2000)
+        # 强制终止后内部锁等状态不可信，不再复用
         try:
             self.worker.progress_updated.disconnect()
-            self.worker.log_message.disconnect()
             self.worker.result_added.disconnect()
             self.worker.stage_completed.disconnect()
             self.worker.error_occurred.disconnect()
-            self.worker.report_saved.disconnect()
+            self.worker.report_ready.disconnect()
             self.worker.finished.disconnect()
         except RuntimeError:
             pass
@@ -3077,17 +3961,18 @@ class MainWindow(QMainWindow):
     def start_worker(self, mode, manual_dir=None):
         """??????"""
         logger.info(f"Start worker: mode={mode}, manual_dir={manual_dir}")
-        self._stage1_workflow_name = self.workflow_combo.currentText()
-        old_results = None
-        old_output_dir = None
-        if mode == 'stage2' and self.worker and hasattr(self.worker, 'stage1_results') and self.worker.stage1_results:
-            old_results = self.worker.stage1_results
-            old_output_dir = self.worker.stage1_output_dir
+        # 渲染子进程仍从磁盘读取 config.ini，先写出待保存的修改
+        if self._config_flush_timer.isActive():
+            self._flush_config()
+        _, parser = self._read_runtime_config()
+        self._stage1_workflow_name = self._selected_workflow_name()
 
         self._cleanup_old_worker()
         self.set_buttons_enabled(False)
         self.complete_frame.setVisible(False)
         self.progress_bar.setValue(0)
+        # 上一次的报告不属于本次任务，新报告写完前不提供打开/删除
+        self.report_file = None
 
         # ????????????
         self.running_indicator.setVisible(True)
@@ -3104,26 +3989,31 @@ class MainWindow(QMainWindow):
         }
         self._set_running_btn(mode_btn_map.get(mode))
 
-        self.worker = WorkerThread(
-            mode,
-            self.task_file,
-            manual_dir,
+        # 配置页未打开过时各取值直接读 config.ini，不为一次运行构建整页控件
+        params = dict(
             comfyui_url=self.get_comfyui_url(),
             source_path=self.get_source_path(),
             stage1_output_dir=self.get_stage1_output_dir(),
             workflow_path=self.get_selected_workflow_path(),
+            max_stage1_workers=(self.stage1_workers_spin.value() if self._info_page_built
+                                else self._saved_stage1_workers(parser)),
+            force_rerun=(self.force_rerun_check.isChecked() if self._info_page_built
+                         else parser.getboolean("Processing", "ForceRerun", fallback=False)),
+            config=parser,
         )
-        if old_results:
-            self.worker.stage1_results = old_results
-            self.worker.stage1_output_dir = old_output_dir
-
-        self.worker.progress_updated.connect(self.update_progress)
-        self.worker.log_message.connect(self.append_log)
-        self.worker.result_added.connect(self.add_result_row)
-        self.worker.stage_completed.connect(self.on_stage_completed)
-        self.worker.error_occurred.connect(self.on_error)
-        self.worker.report_saved.connect(self.on_report_saved)
-        self.worker.finished.connect(self.on_worker_finished)
+        if self.worker is None:
+            # 工作线程只创建一次、信号只连接一次；之后每次运行仅重新配置参数。
+            # 阶段1结果与任务表缓存留在实例上，阶段2 直接沿用
+            self.worker = WorkerThread(mode, self.task_file, manual_dir, **params)
+            self.worker.progress_updated.connect(self.update_progress)
+            self.worker.batch_started.connect(self.on_batch_started)
+            self.worker.result_added.connect(self.add_result_row)
+            self.worker.stage_completed.connect(self.on_stage_completed)
+            self.worker.error_occurred.connect(self.on_error)
+            self.worker.report_ready.connect(self.on_report_ready)
+            self.worker.finished.connect(self.on_worker_finished)
+        else:
+            self.worker.configure(mode, self.task_file, manual_dir, **params)
 
         self.worker.start()
     def set_buttons_enabled(self, enabled):
@@ -3133,9 +4023,10 @@ class MainWindow(QMainWindow):
         self.auto_btn.setEnabled(enabled and self.task_file is not None)
         self.manual_stage2_btn.setEnabled(enabled and self.task_file is not None)
         
+    @Slot(int, int, str)
     def update_progress(self, current, total, message):
         """????"""
-        self.progress_bar.setMaximum(total)
+        # 量程由 batch_started 设定，逐条进度只更新数值
         self.progress_bar.setValue(current)
         self.status_label.setText(message)
 
@@ -3143,43 +4034,39 @@ class MainWindow(QMainWindow):
         if marker != self._last_progress_marker:
             self._last_progress_marker = marker
             logger.info(f"Progress: {current}/{total} | {message}")
-    def append_log(self, message):
-        """Worker signal hook; global logger handler already captures details."""
-        _ = message
-    def add_result_row(self, folder, filename, status, output_path):
-        """添加结果行到表格"""
-        row = self.result_table.rowCount()
-        self.result_table.insertRow(row)
-        
-        # 序号
-        num_item = QTableWidgetItem(str(row + 1))
-        num_item.setTextAlignment(Qt.AlignCenter)
-        num_item.setForeground(QBrush(QColor("#94a3b8")))
-        self.result_table.setItem(row, 0, num_item)
-        
-        # 文件 (文件夹/文件名)
-        file_item = QTableWidgetItem(f"{folder}/{filename}")
-        file_item.setForeground(QBrush(QColor("#e2e8f0")))
-        self.result_table.setItem(row, 1, file_item)
-        
-        # 状态
-        status_item = QTableWidgetItem(status)
-        status_item.setTextAlignment(Qt.AlignCenter)
-        if "成功" in status or "完成" in status:
-            status_item.setForeground(QBrush(QColor("#4ade80")))
-            status_item.setBackground(QBrush(QColor(34, 197, 94, 30)))
-        else:
-            status_item.setForeground(QBrush(QColor("#f87171")))
-            status_item.setBackground(QBrush(QColor(248, 113, 113, 30)))
-        self.result_table.setItem(row, 2, status_item)
-        
-        # 输出/链接
-        output_item = QTableWidgetItem(output_path)
-        output_item.setForeground(QBrush(QColor("#93c5fd")))
-        self.result_table.setItem(row, 3, output_item)
-        
-        self.result_table.scrollToBottom()
+
+    @Slot(int)
+    def on_batch_started(self, total):
+        """新一批任务开始：一次性设定进度条量程"""
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(0)
+        self._last_progress_marker = None
+
+    @Slot(str, str, str, str, int)
+    def add_result_row(self, folder, filename, status, output_path, status_code):
+        """添加结果行到表格（合并到下一次定时刷新）"""
+        self._pending_rows.append((folder, filename, status, output_path, status_code))
+        if not self._row_flush_timer.isActive():
+            self._row_flush_timer.start()
+
+    def _flush_pending_rows(self):
+        rows, self._pending_rows = self._pending_rows, []
+        if rows:
+            # 整批插入期间暂停视口重绘，插入与滚动合并为一次绘制
+            self.result_table.setUpdatesEnabled(False)
+            try:
+                self._result_model.append_rows(rows)
+            finally:
+                self.result_table.setUpdatesEnabled(True)
+            self.result_table.scrollToBottom()
+
+    def _clear_results(self):
+        """清空结果表，连同尚未刷新的待插入行"""
+        self._pending_rows.clear()
+        self._row_flush_timer.stop()
+        self._result_model.clear()
             
+    @Slot(str, str, bool)
     def on_stage_completed(self, stage_name, output_dir, success):
         """阶段完成处理"""
         self.current_output_dir = output_dir
@@ -3198,25 +4085,48 @@ class MainWindow(QMainWindow):
         elif stage_name in ("stage2", "manual_stage2"):
             self.complete_label.setText("✅ 全部完成！图片已处理并上传到阿里云 OSS。")
             self.output_path_label.setText(f"输出目录: {os.path.abspath(output_dir)}")
+            # 报告在线程池中写出，可能晚于完成信号；写完前按钮保持禁用
             if self.report_file:
                 self.report_label.setText(f"报告文件: {self.report_file}")
+            else:
+                self.report_label.setText("报告生成中...")
             self.complete_frame.setVisible(True)
             # 阶段2显示报告按钮
             self.open_report_btn.setVisible(True)
             self.delete_report_btn.setVisible(True)
+            self.open_report_btn.setEnabled(bool(self.report_file))
+            self.delete_report_btn.setEnabled(bool(self.report_file))
             self.open_report_folder_btn.setVisible(True)
             self.gallery_btn.setVisible(False)
     
+    @Slot(str, object)
+    def on_report_ready(self, report_path, aggregator):
+        """工作线程交来报告数据，放到线程池写出"""
+        self.report_file = None
+        self.open_report_btn.setEnabled(False)
+        self.delete_report_btn.setEnabled(False)
+        self._write_report_async(report_path, aggregator, self.on_report_saved)
+
+    def _write_report_async(self, report_path, aggregator, on_saved):
+        task = ReportRunnable(report_path, aggregator)
+        task.signals.report_saved.connect(on_saved)
+        QThreadPool.globalInstance().start(task)
+
+    @Slot(str)
     def on_report_saved(self, report_path):
         """报告保存完成"""
         self.report_file = report_path
         self.report_label.setText(f"报告文件: {report_path}")
+        self.open_report_btn.setEnabled(True)
+        self.delete_report_btn.setEnabled(True)
             
+    @Slot(str)
     def on_error(self, error_message):
         """????"""
         logger.error(f"Worker error: {error_message}")
         QMessageBox.critical(self, "错误", error_message)
         self.status_label.setText("错误")
+    @Slot()
     def on_worker_finished(self):
         """??????"""
         logger.info("Worker finished")
@@ -3227,57 +4137,76 @@ class MainWindow(QMainWindow):
         self._set_running_btn(None)
         # 先清除运行按钮状态，再启用按钮（避免 _set_running_btn 把按钮又禁用）
         self.set_buttons_enabled(True)
-        self.status_label.setText("\u5b8c\u6210")
+        # 用户停止时 stop_processing 已更新状态，这里不要覆盖成“完成”
+        stopped = self.worker is not None and self.worker.should_stop
+        self.status_label.setText("\u5df2\u505c\u6b62" if stopped else "\u5b8c\u6210")
     def animate_indicator(self):
         """平滑正弦波呼吸灯动画"""
         self._pulse_step += 1
         # 正弦波: 周期约2.5秒 (2.5s / 0.04s = ~63 steps per half cycle)
         t = math.sin(self._pulse_step * 0.05) * 0.5 + 0.5  # 0.0 ~ 1.0
-
-        # 运行指示器小圆点颜色
-        indicator_r = int(100 + 55 * t)
-        indicator_g = int(160 + 60 * t)
-        indicator_b = int(220 + 35 * t)
-        self.running_indicator.setStyleSheet(
-            f"font-size: 18px; color: rgb({indicator_r},{indicator_g},{indicator_b});"
-        )
+        # 亮度量化为有限档位: 档位不变时跳过 setStyleSheet（每次都会重新解析 QSS）
+        level = round(t * (self._PULSE_LEVELS - 1))
+        if level == self._pulse_level:
+            return
+        self._pulse_level = level
+        self.running_indicator.setStyleSheet(self._pulse_qss(None, level))
 
         # 呼吸脉冲: 平滑渐变按钮背景和边框
         if self._running_btn:
-            obj_name = self._running_btn.objectName()
+            qss = self._pulse_qss(self._running_btn.objectName(), level)
+            if qss:
+                self._running_btn.setStyleSheet(qss)
+
+    def _pulse_qss(self, obj_name, level):
+        """按 (按钮, 档位) 缓存呼吸动画的内联样式；obj_name 为 None 表示运行指示器"""
+        key = (obj_name, level)
+        qss = self._pulse_qss_cache.get(key)
+        if qss is not None:
+            return qss
+        t = level / (self._PULSE_LEVELS - 1)
+        if obj_name is None:
+            # 运行指示器小圆点颜色
+            indicator_r = int(100 + 55 * t)
+            indicator_g = int(160 + 60 * t)
+            indicator_b = int(220 + 35 * t)
+            qss = f"font-size: 18px; color: rgb({indicator_r},{indicator_g},{indicator_b});"
+        else:
             theme = self._btn_color_themes.get(obj_name)
-            if theme:
+            if not theme:
+                qss = ""
+            else:
                 dim_bg, bright_bg, dim_bd, bright_bd = theme
                 bg = tuple(int(d + (b - d) * t) for d, b in zip(dim_bg, bright_bg))
                 bd = tuple(int(d + (b - d) * t) for d, b in zip(dim_bd, bright_bd))
-                self._running_btn.setStyleSheet(
+                qss = (
                     f"color: #ffffff; font-weight: 700;"
                     f"background: rgb({bg[0]},{bg[1]},{bg[2]});"
                     f"border: 2px solid rgb({bd[0]},{bd[1]},{bd[2]});"
                     f"border-radius: 8px; padding: 8px 12px; min-height: 30px;"
                 )
+        self._pulse_qss_cache[key] = qss
+        return qss
 
     def _set_running_btn(self, btn):
         """设置/清除当前运行中的按钮高亮"""
         if self._running_btn:
             # 清除内联样式，恢复QSS主题样式
-            self._running_btn.setStyleSheet("")
-            self._running_btn.setProperty("running", False)
-            self._running_btn.style().unpolish(self._running_btn)
-            self._running_btn.style().polish(self._running_btn)
-            self._running_btn.setEnabled(False)
+            prev = self._running_btn
+            prev.setStyleSheet("")
+            _set_style_property(prev, "running", False)
+            prev.setEnabled(False)
         self._running_btn = btn
         self._pulse_step = 0
+        self._pulse_level = None
         if btn:
-            btn.setProperty("running", True)
             btn.setEnabled(True)
-            btn.style().unpolish(btn)
-            btn.style().polish(btn)
+            _set_style_property(btn, "running", True)
     
     def _open_gallery(self):
         """打开 Stage1 图库预览（如果已有窗口则激活显示）"""
         # 如果已有图库窗口且未关闭，直接激活显示
-        if hasattr(self, '_gallery_dlg') and self._gallery_dlg is not None:
+        if self._gallery_dlg is not None:
             if self._gallery_dlg.isVisible():
                 self._gallery_dlg.showNormal()
                 self._gallery_dlg.activateWindow()
@@ -3285,7 +4214,7 @@ class MainWindow(QMainWindow):
                 return
 
         if not self.worker or not self.worker.stage1_results:
-            QMessageBox.warning(self, "警告", "没有阶段1的处理结果！")
+            self._warn("警告", "没有阶段1的处理结果！")
             return
 
         image_paths = []
@@ -3297,7 +4226,7 @@ class MainWindow(QMainWindow):
                 source_map[out] = src_path
 
         if not image_paths:
-            QMessageBox.warning(self, "警告", "未找到有效的输出图片！")
+            self._warn("警告", "未找到有效的输出图片！")
             return
 
         self._gallery_dlg = ImageGalleryDialog(
@@ -3316,10 +4245,13 @@ class MainWindow(QMainWindow):
             return
 
         output_dir = self.current_output_dir
-        if not output_dir and self.worker and hasattr(self.worker, 'stage1_output_dir'):
+        if not output_dir and self.worker:
             output_dir = self.worker.stage1_output_dir
 
         self._cleanup_old_worker()
+        if self.worker is not None:
+            # 被中断的阶段1结果不完整，不交给阶段2
+            self.worker.stage1_results = {}
 
         # 隐藏指示器
         self.running_indicator.setVisible(False)
@@ -3338,6 +4270,7 @@ class MainWindow(QMainWindow):
             return
         self.current_output_dir = output_dir
         output_path = os.path.abspath(output_dir)
+        existing = self._resolve_existing(output_path)
         
         # 提示清理对话框
         msg = QMessageBox(self)
@@ -3357,20 +4290,20 @@ class MainWindow(QMainWindow):
         clicked = msg.clickedButton()
         if clicked == delete_btn:
             try:
-                import shutil
-                if os.path.exists(output_path):
-                    shutil.rmtree(output_path)
-                    QMessageBox.information(self, "成功", f"已删除: {output_path}")
+                if existing:
+                    shutil.rmtree(existing)
+                    existing = None
+                    self._info("成功", f"已删除: {output_path}")
             except Exception as e:
-                QMessageBox.warning(self, "删除失败", f"无法删除: {e}")
+                self._warn("删除失败", f"无法删除: {e}")
         elif clicked == open_btn:
-            if os.path.exists(output_path):
-                subprocess.run(['explorer', output_path])
+            if existing:
+                _open_local(existing)
             else:
-                QMessageBox.warning(self, "警告", f"目录不存在: {output_path}")
+                self._warn("警告", f"目录不存在: {output_path}")
 
         # 停止后显示complete_frame，方便用户打开输出目录
-        if self.current_output_dir and os.path.exists(os.path.abspath(self.current_output_dir)):
+        if existing:
             self.complete_label.setText("⚠️ 任务已停止")
             self.output_path_label.setText(f"输出目录: {output_path}")
             self.report_label.setText("")
@@ -3380,26 +4313,38 @@ class MainWindow(QMainWindow):
             self.open_report_folder_btn.setVisible(False)
             self.gallery_btn.setVisible(False)
 
+    @staticmethod
+    def _resolve_existing(path):
+        """一次 stat 判断路径是否存在；存在返回原路径，否则返回 None"""
+        if not path:
+            return None
+        try:
+            os.stat(path)
+        except (OSError, ValueError):
+            return None
+        return path
+
     def open_output_folder(self):
         """打开输出文件夹"""
         if self.current_output_dir:
             path = os.path.abspath(self.current_output_dir)
-            if os.path.exists(path):
-                subprocess.run(['explorer', path])
+            if self._resolve_existing(path):
+                _open_local(path)
             else:
-                QMessageBox.warning(self, "警告", f"目录不存在: {path}")
+                self._warn("警告", f"目录不存在: {path}")
     
     def open_report(self):
         """打开报告Excel"""
-        if self.report_file and os.path.exists(self.report_file):
-            os.startfile(self.report_file)
+        path = self._resolve_existing(self.report_file)
+        if path:
+            _open_local(path)
         else:
-            QMessageBox.warning(self, "警告", "报告文件不存在")
+            self._warn("警告", "报告文件不存在")
 
     def delete_report(self):
         """删除报告Excel"""
-        if not self.report_file or not os.path.exists(self.report_file):
-            QMessageBox.warning(self, "警告", "报告文件不存在")
+        if not self._resolve_existing(self.report_file):
+            self._warn("警告", "报告文件不存在")
             return
         reply = QMessageBox.question(
             self, "确认删除",
@@ -3413,21 +4358,21 @@ class MainWindow(QMainWindow):
                 self.open_report_btn.setVisible(False)
                 self.delete_report_btn.setVisible(False)
             except Exception as e:
-                QMessageBox.warning(self, "错误", f"删除失败: {e}")
+                self._warn("错误", f"删除失败: {e}")
     
     def open_report_folder(self):
         """打开报告所在文件夹"""
         report_path = os.path.abspath("final_report.xlsx")
         folder = os.path.dirname(report_path)
-        if os.path.exists(folder):
-            subprocess.run(['explorer', folder])
+        if self._resolve_existing(folder):
+            _open_local(folder)
         else:
-            QMessageBox.warning(self, "警告", f"目录不存在: {folder}")
+            self._warn("警告", f"目录不存在: {folder}")
     
     def check_old_report(self):
         """检查旧报告文件，提示删除以避免数据混乱"""
         report_path = os.path.abspath("final_report.xlsx")
-        if os.path.exists(report_path):
+        if self._resolve_existing(report_path):
             # 创建自定义对话框
             msg = QMessageBox(self)
             msg.setIcon(QMessageBox.Warning)
@@ -3447,13 +4392,13 @@ class MainWindow(QMainWindow):
             if clicked == delete_btn:
                 try:
                     os.remove(report_path)
-                    QMessageBox.information(self, "成功", "旧报告已删除！")
+                    self._info("成功", "旧报告已删除！")
                     return True
                 except Exception as e:
-                    QMessageBox.warning(self, "删除失败", f"无法删除文件: {e}")
+                    self._warn("删除失败", f"无法删除文件: {e}")
                     return False
             elif clicked == open_btn:
-                subprocess.run(['explorer', '/select,', report_path])
+                _reveal_in_folder(report_path)
                 return False  # 用户需要手动处理后重新点击
             elif clicked == continue_btn:
                 return True  # 用户选择继续
@@ -3465,26 +4410,37 @@ class MainWindow(QMainWindow):
 
     def get_comfyui_url(self) -> str:
         """??????? ComfyUI ???"""
+        if not self._info_page_built:
+            return self._saved_comfyui_url(self._read_runtime_config()[1])
         return self.comfyui_url_input.text().strip()
 
+    @staticmethod
+    def _saved_comfyui_url(parser) -> str:
+        """Build the ComfyUI URL saved in config.ini ("" if none)."""
+        saved_host = parser.get("ComfyUI", "Host", fallback="")
+        saved_port = parser.get("ComfyUI", "DefaultPort", fallback="")
+        saved_scheme = parser.get("ComfyUI", "Scheme", fallback="")
+        if not (saved_host and saved_port):
+            return ""
+        scheme = saved_scheme if saved_scheme in ("http", "https") else ("https" if saved_port in ("443",) else "http")
+        return f"{scheme}://{saved_host}:{saved_port}"
+
+    @staticmethod
+    def _saved_stage1_workers(parser) -> int:
+        """阶段1并发数，限制在配置页输入框的范围内"""
+        return min(max(parser.getint("ComfyUI", "MaxWorkers", fallback=2), 1), 8)
+
     def _normalize_comfyui_url(self, url: str) -> str:
         """Normalize user input URL for test/save."""
-        clean = (url or "").strip()
-        if not clean:
-            return ""
-        if "://" not in clean:
-            clean = f"http://{clean}"
-        return clean.rstrip("/")
+        return _normalize_url(url or "")
 
     def _set_comfyui_status(self, state: str, message: str):
         """Update ComfyUI config status text and style state."""
-        if not hasattr(self, "comfyui_status_label"):
+        if self.comfyui_status_label is None:
             return
-        self.comfyui_status_label.setProperty("state", state)
+        # 状态不变时只换文字（QLabel 文字相同也会直接跳过），不重算样式
         self.comfyui_status_label.setText(message)
-        self.comfyui_status_label.style().unpolish(self.comfyui_status_label)
-        self.comfyui_status_label.style().polish(self.comfyui_status_label)
-        self.comfyui_status_label.update()
+        _set_style_property(self.comfyui_status_label, "state", state)
 
     def _start_comfyui_glow(self):
         """启动 ComfyUI 输入框绿色流动边框动画"""
@@ -3498,7 +4454,7 @@ class MainWindow(QMainWindow):
         """停止绿色流动边框动画，恢复默认样式"""
         if self._comfyui_glow_timer:
             self._comfyui_glow_timer.stop()
-        if hasattr(self, "comfyui_url_input"):
+        if self.comfyui_url_input is not None:
             self.comfyui_url_input.setStyleSheet("")
 
     def _animate_comfyui_glow(self):
@@ -3530,31 +4486,37 @@ class MainWindow(QMainWindow):
 
     def _on_comfyui_url_changed(self, _text: str):
         """URL changed: require re-test before save."""
+        # 测试结果立即作废，保存按钮立即禁用；其余界面刷新防抖
         self._comfyui_test_ok = False
         self._comfyui_tested_url = ""
+        self._comfyui_pending_test_url = ""
         self._stop_comfyui_glow()
 
-        if not hasattr(self, "save_comfyui_btn") or not hasattr(self, "test_comfyui_btn"):
+        if self.save_comfyui_btn is None:
             return
 
+        self.save_comfyui_btn.setEnabled(False)
+        self._comfyui_url_timer.start()
+
+    def _apply_comfyui_url_changed(self):
+        """Debounced part of the URL-changed handler: refresh test button and status hint."""
         current_url = self._normalize_comfyui_url(self.get_comfyui_url())
         self.save_comfyui_btn.setEnabled(False)
         self.test_comfyui_btn.setEnabled(bool(current_url))
-        self._set_comfyui_status(
-            "pending",
-            "请先点击“测试连接”，连接成功后再保存为全局配置。"
-        )
+        self._set_comfyui_status(_STATE_PENDING, _MSG_TEST_FIRST)
 
     def _test_comfyui_connection(self):
         """Test current ComfyUI URL without saving."""
         raw_url = self.get_comfyui_url()
         url = self._normalize_comfyui_url(raw_url)
         if not url:
-            QMessageBox.warning(self, "警告", "请输入 ComfyUI 地址")
+            self._warn("警告", "请输入 ComfyUI 地址")
             return
 
         if url != raw_url:
             self.comfyui_url_input.setText(url)
+        # 尚未执行的防抖刷新不能覆盖下面的“测试中”状态
+        self._comfyui_url_timer.stop()
 
         if self._comfyui_test_worker and self._comfyui_test_worker.isRunning():
             return
@@ -3564,7 +4526,8 @@ class MainWindow(QMainWindow):
         self.save_comfyui_btn.setEnabled(False)
         self.test_comfyui_btn.setEnabled(False)
         self.test_comfyui_btn.setText("测试中...")
-        self._set_comfyui_status("testing", f"正在测试连接: {url}")
+        self._set_comfyui_status(_STATE_TESTING, f"正在测试连接: {url}")
+        self._comfyui_pending_test_url = url
 
         self._comfyui_test_worker = ComfyUIConnectionTestWorker(url, self)
         self._comfyui_test_worker.check_finished.connect(self._on_comfyui_test_finished)
@@ -3572,46 +4535,51 @@ class MainWindow(QMainWindow):
 
     def _on_comfyui_test_finished(self, ok: bool, tested_url: str, message: str):
         """Handle async test result."""
-        current_url = self._normalize_comfyui_url(self.get_comfyui_url())
+        sent_url, self._comfyui_pending_test_url = self._comfyui_pending_test_url, ""
         self.test_comfyui_btn.setEnabled(True)
         self.test_comfyui_btn.setText("测试连接")
         self._comfyui_test_worker = None
 
+        # 测试期间用户改过地址（sent_url 已被清空）时，结果作废
+        if not sent_url:
+            self.save_comfyui_btn.setEnabled(False)
+            self._set_comfyui_status(_STATE_PENDING, _MSG_RETEST)
+            return
+
         if ok:
-            # 连接成功 — tested_url 可能因 HTTPS→HTTP 回退而与输入不同
-            if tested_url != current_url:
+            # 连接成功 — tested_url 可能因 HTTPS→HTTP 回退而与测试地址不同
+            fell_back = tested_url != sent_url
+            if fell_back:
                 # scheme 回退，自动更新输入框为实际连通的地址
                 self.comfyui_url_input.blockSignals(True)
                 self.comfyui_url_input.setText(tested_url)
                 self.comfyui_url_input.blockSignals(False)
             self._comfyui_test_ok = True
             self._comfyui_tested_url = tested_url
+            # 解析结果随测试结果一起保存，保存时无需再解析
+            parsed = _parse_url(tested_url)
+            self._comfyui_tested_scheme = parsed.scheme
+            self._comfyui_tested_host = parsed.hostname or "127.0.0.1"
+            self._comfyui_tested_port = str(parsed.port or (443 if parsed.scheme == "https" else 8188))
             self.save_comfyui_btn.setEnabled(True)
-            scheme_note = ""
-            if tested_url != current_url:
-                scheme_note = "（已自动切换为 HTTP）"
-            self._set_comfyui_status("ok", f'{message}{scheme_note}，可点击"保存"写入全局配置。')
+            scheme_note = "（已自动切换为 HTTP）" if fell_back else ""
+            self._set_comfyui_status(_STATE_OK, f'{message}{scheme_note}，可点击"保存"写入全局配置。')
             self._start_comfyui_glow()
         else:
-            # 连接失败 — 检查是否是过期结果（用户在测试期间改了地址）
-            if tested_url != current_url:
-                self.save_comfyui_btn.setEnabled(False)
-                self._set_comfyui_status("pending", "地址已修改，请重新测试连接。")
-                return
             self._comfyui_test_ok = False
             self._comfyui_tested_url = ""
             self.save_comfyui_btn.setEnabled(False)
-            self._set_comfyui_status("error", message)
+            self._set_comfyui_status(_STATE_ERROR, message)
             self._stop_comfyui_glow()
 
     def _save_comfyui_url(self):
         """?? ComfyUI ??? config.ini?????????????"""
-        url = self._normalize_comfyui_url(self.get_comfyui_url())
-        if not url:
-            QMessageBox.warning(self, "警告", "请输入 ComfyUI 地址")
+        if not self.get_comfyui_url().strip():
+            self._warn("警告", "请输入 ComfyUI 地址")
             return
 
-        if not self._comfyui_test_ok or self._comfyui_tested_url != url:
+        # 输入框的任何修改都会清掉 _comfyui_test_ok，无需再规范化并比对地址
+        if not self._comfyui_test_ok:
             QMessageBox.warning(
                 self,
                 "未通过测试",
@@ -3619,33 +4587,30 @@ class MainWindow(QMainWindow):
             )
             return
 
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
+        scheme = self._comfyui_tested_scheme
+        host = self._comfyui_tested_host
+        port = self._comfyui_tested_port
 
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        host = parsed.hostname or "127.0.0.1"
-        port = str(parsed.port or (443 if parsed.scheme == "https" else 8188))
+        self._set_config("ComfyUI", {"Host": host, "DefaultPort": port, "Scheme": scheme})
 
-        if not parser.has_section("ComfyUI"):
-            parser.add_section("ComfyUI")
-        parser.set("ComfyUI", "Host", host)
-        parser.set("ComfyUI", "DefaultPort", port)
-        parser.set("ComfyUI", "Scheme", parsed.scheme)
+        self._info("保存成功", f"ComfyUI 地址已保存: {scheme}://{host}:{port}")
+        self._set_comfyui_status(_STATE_OK, f"已保存全局配置: {host}:{port}")
+        self.save_comfyui_btn.setEnabled(False)
 
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
+    def _save_stage1_workers(self, value: int):
+        """保存阶段1并发数到 config.ini"""
+        self._set_config("ComfyUI", {"MaxWorkers": str(value)})
 
-        QMessageBox.information(self, "保存成功", f"ComfyUI 地址已保存: {parsed.scheme}://{host}:{port}")
-        self._set_comfyui_status("ok", f"已保存全局配置: {host}:{port}")
-        self.save_comfyui_btn.setEnabled(False)
+    def _save_force_rerun(self, checked: bool):
+        """保存是否重跑已有结果到 config.ini"""
+        self._set_config("Processing", {"ForceRerun": "true" if checked else "false"})
 
     # ---- 图片源路径配置 ----
 
     def get_source_path(self) -> str:
         """返回当前配置的图片源路径"""
+        if not self._info_page_built:
+            return self._read_runtime_config()[1].get("Paths", "SourcePath", fallback="").strip()
         return self.source_path_input.text().strip()
 
     def _browse_source_path(self):
@@ -3658,29 +4623,25 @@ class MainWindow(QMainWindow):
         """保存图片源路径到 config.ini"""
         path = self.get_source_path()
         if not path:
-            QMessageBox.warning(self, "警告", "请输入或选择图片源路径")
+            self._warn("警告", "请输入或选择图片源路径")
             return
-        if not os.path.isdir(path):
-            QMessageBox.warning(self, "警告", f"路径不存在: {path}")
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is None or not stat.S_ISDIR(st.st_mode):
+            self._warn("警告", f"路径不存在: {path}")
             return
 
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        if not parser.has_section("Paths"):
-            parser.add_section("Paths")
-        parser.set("Paths", "SourcePath", path)
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
-        QMessageBox.information(self, "保存成功", f"图片源路径已保存: {path}")
+        self._set_config("Paths", {"SourcePath": path})
+        self._info("保存成功", f"图片源路径已保存: {path}")
 
     # ---- Stage1 Output Path Config ----
 
     def get_stage1_output_dir(self) -> str:
         """Return configured stage1 output directory."""
-        if not hasattr(self, "stage1_output_input"):
-            return ""
+        if not self._info_page_built:
+            return self._read_runtime_config()[1].get("Paths", "Stage1OutputPath", fallback="").strip()
         return self.stage1_output_input.text().strip()
 
     def _browse_stage1_output_dir(self):
@@ -3694,96 +4655,175 @@ class MainWindow(QMainWindow):
         """Save stage1 output directory into config.ini."""
         path = self.get_stage1_output_dir()
         if not path:
-            QMessageBox.warning(self, "Warning", "Please input or choose stage1 output directory")
-            return
-        if os.path.isfile(path):
-            QMessageBox.warning(self, "Warning", f"Path is a file, not a folder: {path}")
+            self._warn("Warning", "Please input or choose stage1 output directory")
             return
+        # 一次 stat 同时判断“是文件”和“已存在”，已存在的目录无需再 makedirs
         try:
-            os.makedirs(path, exist_ok=True)
-        except Exception as e:
-            QMessageBox.warning(self, "Warning", f"Failed to create directory: {e}")
+            st = os.stat(path)
+        except OSError:
+            st = None
+        if st is not None and stat.S_ISREG(st.st_mode):
+            self._warn("Warning", f"Path is a file, not a folder: {path}")
             return
+        if st is None:
+            try:
+                os.makedirs(path, exist_ok=True)
+            except Exception as e:
+                self._warn("Warning", f"Failed to create directory: {e}")
+                return
 
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        if not parser.has_section("Paths"):
-            parser.add_section("Paths")
-        parser.set("Paths", "Stage1OutputPath", path)
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
-        QMessageBox.information(self, "Saved", f"Stage1 output path saved: {path}")
+        self._set_config("Paths", {"Stage1OutputPath": path})
+        self._info("Saved", f"Stage1 output path saved: {path}")
 
     def _clear_stage1_output_dir(self):
         """清空阶段1输出目录下的所有内容（保留根文件夹）"""
         path = self.get_stage1_output_dir()
         if not path:
-            QMessageBox.warning(self, "警告", "请先配置阶段1输出路径")
+            self._warn("警告", "请先配置阶段1输出路径")
             return
         if not os.path.isdir(path):
-            QMessageBox.warning(self, "警告", f"目录不存在: {path}")
+            self._warn("警告", f"目录不存在: {path}")
             return
 
-        # 统计内容
-        items = os.listdir(path)
-        if not items:
-            QMessageBox.information(self, "提示", "目录已经是空的。")
+        # 统计内容：拿到第一项即可判断非空，计数时不构建列表
+        with os.scandir(path) as it:
+            first = next(it, None)
+            count = 0 if first is None else 1 + sum(1 for _ in it)
+        if first is None:
+            self._info("提示", "目录已经是空的。")
             return
 
         reply = QMessageBox.warning(
             self, "确认清空",
             f"即将删除以下目录中的所有内容:\n\n"
             f"📁 {path}\n\n"
-            f"共 {len(items)} 个文件/文件夹，此操作不可撤销！",
+            f"共 {count} 个文件/文件夹，此操作不可撤销！",
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No,
         )
         if reply != QMessageBox.Yes:
             return
 
-        try:
-            for item in items:
-                item_path = os.path.join(path, item)
-                if os.path.isdir(item_path):
-                    shutil.rmtree(item_path)
+        # DirEntry 自带类型信息，无需逐项 stat
+        dir_paths = []
+        file_paths = []
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    dir_paths.append(entry.path)
                 else:
-                    os.remove(item_path)
-            QMessageBox.information(self, "完成", f"已清空: {path}")
-        except Exception as e:
-            QMessageBox.warning(self, "清空失败", f"部分内容无法删除: {e}")
+                    file_paths.append(entry.path)
+        self.clear_stage1_btn.setEnabled(False)
+        self._clear_stage1_path = path
+        self._clear_stage1_worker = ClearDirWorker(dir_paths, file_paths, self)
+        self._clear_stage1_worker.clear_finished.connect(self._on_clear_stage1_finished)
+        self._clear_stage1_worker.finished.connect(self._clear_stage1_worker.deleteLater)
+        self._clear_stage1_worker.start()
+
+    def _on_clear_stage1_finished(self, ok: bool, error: str):
+        """清空线程结束回调"""
+        self._clear_stage1_worker = None
+        self.clear_stage1_btn.setEnabled(True)
+        if ok:
+            self._info("完成", f"已清空: {self._clear_stage1_path}")
+        else:
+            self._warn("清空失败", f"部分内容无法删除: {error}")
 
     # ---- Workflow Selection Config ----
 
     def _get_workflows_dir(self) -> Path:
         """Return the workflows/ directory path, creating it if needed."""
-        wf_dir = Path(__file__).parent / "workflows"
-        wf_dir.mkdir(exist_ok=True)
-        return wf_dir
+        if not self._workflows_dir_ready:
+            self._workflows_dir.mkdir(exist_ok=True)
+            self._workflows_dir_ready = True
+        return self._workflows_dir
 
     def _refresh_workflow_combo(self):
-        """Scan workflows/ directory and repopulate the combo box."""
-        self.workflow_combo.blockSignals(True)
-        current = self.workflow_combo.currentText()
-        self.workflow_combo.clear()
-        wf_dir = self._get_workflows_dir()
-        names = sorted(
-            p.stem for p in wf_dir.glob("*.json")
-        )
-        self.workflow_combo.addItems(names)
-        # restore previous selection if still present
-        idx = self.workflow_combo.findText(current)
-        if idx >= 0:
-            self.workflow_combo.setCurrentIndex(idx)
-        self.workflow_combo.blockSignals(False)
+        """Scan workflows/ directory and sync the combo box with it."""
+        # 目录 mtime 未变说明没有增删文件，下拉框已是最新
+        try:
+            mtime = os.stat(self._workflows_dir).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is not None and mtime == self._wf_cache_mtime:
+            return
+        self._wf_cache_mtime = mtime
+        try:
+            with os.scandir(self._workflows_dir) as it:
+                names = sorted(
+                    e.name[:-5] for e in it
+                    if e.name.endswith(".json") and e.is_file(follow_symlinks=False)
+                )
+        except FileNotFoundError:
+            self._get_workflows_dir()
+            names = []
+        else:
+            self._workflows_dir_ready = True
+
+        # 只增删差异项，保持列表有序，避免 clear() + addItems() 重建整个模型
+        combo = self.workflow_combo
+        combo.blockSignals(True)
+        wanted = set(names)
+        for i in range(combo.count() - 1, -1, -1):
+            if combo.itemText(i) not in wanted:
+                combo.removeItem(i)
+        existing = [combo.itemText(i) for i in range(combo.count())]
+        present = set(existing)
+        for name in names:
+            if name not in present:
+                pos = bisect.bisect_left(existing, name)
+                combo.insertItem(pos, name)
+                existing.insert(pos, name)
+        combo.blockSignals(False)
+        # 信号被屏蔽期间当前项可能已变化
+        self._cached_wf_path = None
+
+    def _invalidate_wf_path_cache(self, _index=None):
+        """Drop the cached workflow path after the selection changes."""
+        self._cached_wf_path = None
+
+    def _on_workflows_dir_changed(self, _path: str):
+        """workflows/ changed on disk: rescan regardless of mtime granularity."""
+        self._wf_cache_mtime = None
+        self._refresh_workflow_combo()
 
     def get_selected_workflow_path(self) -> str:
         """Return full path of the currently selected workflow JSON."""
-        name = self.workflow_combo.currentText()
-        if not name:
+        if self._info_page_built and self._cached_wf_path is not None:
+            return self._cached_wf_path
+        name = self._selected_workflow_name()
+        if name:
+            path = os.path.join(str(self._get_workflows_dir()), name + ".json")
+        else:
+            path = ""
+        if self._info_page_built:
+            self._cached_wf_path = path
+        return path
+
+    @staticmethod
+    def _saved_workflow_name(parser) -> str:
+        """Name of the workflow last selected in config.ini."""
+        return parser.get("ComfyUI", "SelectedWorkflow", fallback="默认工作流")
+
+    def _selected_workflow_name(self) -> str:
+        """当前选中的工作流名；配置页未构建时按下拉框的规则从磁盘推算"""
+        if self._info_page_built:
+            return self.workflow_combo.currentText()
+        saved = self._saved_workflow_name(self._read_runtime_config()[1])
+        workflows_dir = self._get_workflows_dir()
+        if (workflows_dir / f"{saved}.json").is_file():
+            return saved
+        # 保存的工作流不存在时下拉框停在按名称排序的第一项
+        try:
+            with os.scandir(workflows_dir) as it:
+                names = [
+                    e.name[:-5] for e in it
+                    if e.name.endswith(".json") and e.is_file(follow_symlinks=False)
+                ]
+        except FileNotFoundError:
+            # 运行期间 workflows/ 被删除：与下拉框一样视为没有工作流
             return ""
-        return str(self._get_workflows_dir() / f"{name}.json")
+        return min(names, default="")
 
     def _upload_workflow(self):
         """Let user pick a JSON file, name it, and copy into workflows/."""
@@ -3806,12 +4846,24 @@ class MainWindow(QMainWindow):
             )
             if ret != QMessageBox.Yes:
                 return
-        shutil.copy2(src, dest)
+        # 复制放到线程池执行，源文件在网络盘上时也不会卡住界面
+        self.upload_workflow_btn.setEnabled(False)
+        task = CopyRunnable(src, str(dest), name)
+        task.signals.copy_finished.connect(self._on_workflow_copied)
+        QThreadPool.globalInstance().start(task)
+
+    def _on_workflow_copied(self, name: str, error: str):
+        """工作流复制完成回调"""
+        self.upload_workflow_btn.setEnabled(True)
+        if error:
+            self._warn("上传失败", f"工作流 \"{name}\" 复制失败: {error}")
+            return
+        self._wf_cache_mtime = None
         self._refresh_workflow_combo()
         idx = self.workflow_combo.findText(name)
         if idx >= 0:
             self.workflow_combo.setCurrentIndex(idx)
-        QMessageBox.information(self, "上传成功", f"工作流 \"{name}\" 已添加")
+        self._info("上传成功", f"工作流 \"{name}\" 已添加")
 
     def _delete_workflow(self):
         """Delete the currently selected workflow file."""
@@ -3825,31 +4877,31 @@ class MainWindow(QMainWindow):
         if ret != QMessageBox.Yes:
             return
         path = self._get_workflows_dir() / f"{name}.json"
-        if path.exists():
-            path.unlink()
+        path.unlink(missing_ok=True)
+        self._wf_cache_mtime = None
         self._refresh_workflow_combo()
-        QMessageBox.information(self, "删除成功", f"工作流 \"{name}\" 已删除")
+        self._info("删除成功", f"工作流 \"{name}\" 已删除")
 
     def _save_workflow_selection(self):
         """Save the current workflow selection to config.ini."""
         name = self.workflow_combo.currentText()
         if not name:
-            QMessageBox.warning(self, "警告", "请先选择一个工作流")
-            return
-        config_path = Path(__file__).parent / "config.ini"
-        parser = configparser.ConfigParser()
-        if config_path.exists():
-            parser.read(config_path, encoding="utf-8")
-        if not parser.has_section("ComfyUI"):
-            parser.add_section("ComfyUI")
-        parser.set("ComfyUI", "SelectedWorkflow", name)
-        with open(config_path, "w", encoding="utf-8") as f:
-            parser.write(f)
-        QMessageBox.information(self, "保存成功", f"已选择工作流: {name}")
+            self._warn("警告", "请先选择一个工作流")
+            return
+        self._set_config("ComfyUI", {"SelectedWorkflow": name})
+        self._info("保存成功", f"已选择工作流: {name}")
 
     def _check_for_updates(self, silent=True):
         """Check updates in background; show dialogs only when silent=False."""
-        if self._update_checker and self._update_checker.isRunning():
+        if self._update_checker is None:
+            # 长期复用同一个检查器，以便保留 ETag 缓存
+            self._update_checker = UpdateChecker(
+                APP_VERSION, GITHUB_REPO, cache_path=str(_UPDATE_CACHE_PATH), parent=self
+            )
+            self._update_checker.update_available.connect(self._on_update_available)
+            self._update_checker.no_update.connect(self._on_no_update)
+            self._update_checker.check_failed.connect(self._on_update_check_failed)
+        if self._update_checker.is_running():
             return
 
         self._update_check_silent = silent
@@ -3857,11 +4909,8 @@ class MainWindow(QMainWindow):
         self.update_check_btn.setText("检查中...")
         logger.info(f"Start update check: version={APP_VERSION}, repo={GITHUB_REPO}, silent={silent}")
 
-        self._update_checker = UpdateCheckWorker(APP_VERSION, GITHUB_REPO)
-        self._update_checker.update_available.connect(self._on_update_available)
-        self._update_checker.no_update.connect(self._on_no_update)
-        self._update_checker.check_failed.connect(self._on_update_check_failed)
-        self._update_checker.start()
+        # 静默检查 1 小时内直接复用上次结果；手动检查总是请求（有 ETag 时为条件请求）
+        self._update_checker.start(max_age=_UPDATE_CACHE_TTL if silent else 0)
 
     def _on_update_available(self, release_info):
         """New version found."""
@@ -3896,17 +4945,42 @@ class MainWindow(QMainWindow):
                 "2. 尚未创建 GitHub Release；\n"
                 "3. Release 未上传 .zip 更新包资产。"
             )
-            QMessageBox.warning(self, "检查更新失败", f"{error}\n\n{hint}")
+            self._warn("检查更新失败", f"{error}\n\n{hint}")
+
+    def closeEvent(self, event):
+        """关闭前写出尚未落盘的配置；工作线程仍在运行时先通知停止，等其 finished 后再关闭"""
+        if self._config_flush_timer.isActive():
+            self._flush_config()
+        running = [w for w in (self.worker, self._tpl_worker) if w is not None and w.isRunning()]
+        if running:
+            if self._close_deadline is None:
+                # 第一次关闭：请求停止，不在界面线程里 wait()
+                # 截止时间略早于兜底定时器：2s 以上的 singleShot 是粗精度定时器，可能提前约 5% 触发
+                self._close_deadline = time.monotonic() + 2.5
+                self.status_label.setText("正在停止...")
+                for w in running:
+                    w.stop()
+                    w.finished.connect(self.close)
+                QTimer.singleShot(3000, self.close)
+                event.ignore()
+                return
+            if time.monotonic() < self._close_deadline:
+                event.ignore()  # 还有线程未退出，等下一个 finished 或超时
+                return
+            logger.warning("工作线程 3s 内未结束，强制终止")
+            for w in running:
+                w.terminate()
+                w.wait(1000)
+        super().closeEvent(event)
 
 
 def main():
     """主函数"""
     # 配置文件日志 - 写入 process.log
-    from pathlib import Path as _Path
-    _log_path = _Path(__file__).parent / "process.log"
+    _log_path = _MODULE_DIR / "process.log"
     _file_handler = logging.FileHandler(str(_log_path), encoding="utf-8", mode="w")
     _file_handler.setLevel(logging.DEBUG)
-    _file_handler.setFormatter(logging.Formatter(
+    _file_handler.setFormatter(_CachedTimeFormatter(
         "%(asctime)s | %(levelname)-7s | %(name)s | %(message)s",
         "%Y-%m-%d %H:%M:%S",
     ))
@@ -3926,5 +5000,7 @@ def main():
 
 
 if __name__ == "__main__":
+    # 正式入口是 run_gui.py；直接运行本文件也可以，只是阶段2 的子进程会重新导入整个 gui_app
+    multiprocessing.freeze_support()
     main()
 
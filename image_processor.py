@@ -9,7 +9,7 @@ import re
 import numpy as np
 import logging
 from PIL import Image, ImageDraw, ImageFont
-import configparser
+from fast_config import FastConfigParser
 
 logger = logging.getLogger(__name__)
 
@@ -70,10 +70,10 @@ class ImageProcessor:
     def __init__(self, config_path="config.ini"):
         self.debug_mode = False
         
-        self.config = configparser.ConfigParser()
+        self.config = FastConfigParser()
         try:
             with open(config_path, 'r', encoding='utf-8') as f:
-                self.config.read_file(f)
+                self.config.read_string(f.read())
         except FileNotFoundError:
             logger.warning(f"Config file not found at {config_path}")
         except Exception as e:
@@ -344,4 +344,26 @@ class ImageProcessor:
             logger.error(f"Error processing {image_path}: {e}")
             import traceback
             logger.error(traceback.format_exc())
-            return False
\ No newline at end of file
+            return False
+
+
+# ---- Process-pool entry points (stage 2) ----
+
+# 每个工作进程各持有一个处理器，配置读取与默认字体解析只做一次
+_pool_processor = None
+
+
+def init_pool_processor(config_path="config.ini"):
+    """ProcessPoolExecutor initializer: pre-build the per-process ImageProcessor."""
+    global _pool_processor
+    _pool_processor = ImageProcessor(config_path)
+
+
+def process_image_in_pool(image_path, output_path, top_text, bottom_text, top_size=0, bottom_size=0, font_name=None):
+    """Picklable module-level wrapper around ImageProcessor.process_image."""
+    if _pool_processor is None:
+        init_pool_processor()
+    return _pool_processor.process_image(
+        image_path, output_path, top_text, bottom_text,
+        top_size=top_size, bottom_size=bottom_size, font_name=font_name
+    )
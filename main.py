@@ -7,7 +7,7 @@ from datetime import datetime
 from image_processor import ImageProcessor
 from oss_uploader import OSSUploader
 from comfyui_client import ComfyUIClient
-from utils import setup_logging, ensure_dir, check_and_download_font
+from utils import setup_logging, ensure_dir, check_and_download_font, read_excel, write_excel
 
 logger = setup_logging()
 
@@ -50,7 +50,7 @@ def main():
         logger.warning("阿里云 OSS 认证失败，上传功能将不可用。")
     
     try:
-        df_tasks = pd.read_excel(input_task_file)
+        df_tasks = read_excel(input_task_file)
     except Exception as e:
         logger.error(f"Failed to read task file: {e}")
         return
@@ -416,7 +416,7 @@ def main():
         existing_report_df = pd.DataFrame()
         if os.path.exists(output_report_file):
             try:
-                existing_report_df = pd.read_excel(output_report_file)
+                existing_report_df = read_excel(output_report_file)
             except: pass
 
         if not existing_report_df.empty:
@@ -428,7 +428,7 @@ def main():
         else:
             final_df = new_df
             
-        final_df.to_excel(output_report_file, index=False)
+        write_excel(final_df, output_report_file)
         logger.info(f"Report saved to {output_report_file}")
     else:
          logger.info("No report to save.")
@@ -7,24 +7,38 @@ import oss2
 import os
 import sys
 import logging
-import configparser
 
 logger = logging.getLogger(__name__)
 
+# 超过该大小的文件走分片（断点续传）上传
+MULTIPART_THRESHOLD = 2 * 1024 * 1024
+MULTIPART_PART_SIZE = 1 * 1024 * 1024
+# 单个文件的分片线程数；并发已由阶段2的上传线程池提供，
+# 这里保持 1，总并发 = 上传线程数 × MULTIPART_THREADS
+MULTIPART_THREADS = 1
+
+
+def _app_dir():
+    """程序所在目录：打包后为 exe 同目录，否则为源码目录"""
+    if getattr(sys, "frozen", False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
+
 
 class OSSUploader:
     """阿里云 OSS 上传器"""
     
-    def __init__(self, config_path=None):
-        self.config = configparser.ConfigParser()
-        if config_path is None:
-            # 自动定位 config.ini：优先 exe 同目录，其次源码目录
-            if getattr(sys, "frozen", False):
-                base_dir = os.path.dirname(sys.executable)
-            else:
-                base_dir = os.path.dirname(os.path.abspath(__file__))
-            config_path = os.path.join(base_dir, "config.ini")
-        self.config.read(config_path, encoding='utf-8')
+    def __init__(self, config_path=None, config=None):
+        if config is not None:
+            # 复用调用方已解析好的 ConfigParser，不再重复读取 config.ini
+            self.config = config
+        else:
+            import configparser  # 只有独立使用（未传入 config）时才需要
+            self.config = configparser.ConfigParser()
+            if config_path is None:
+                # 自动定位 config.ini：优先 exe 同目录，其次源码目录
+                config_path = os.path.join(_app_dir(), "config.ini")
+            self.config.read(config_path, encoding='utf-8')
         
         # 读取OSS配置
         self.endpoint = self.config.get("OSS", "Endpoint", fallback="")
@@ -35,6 +49,7 @@ class OSSUploader:
         
         self.bucket = None
         self.auth = None
+        self._store = None
     
     def authenticate(self):
         """验证并连接到 OSS"""
@@ -127,8 +142,17 @@ class OSSUploader:
                     import time
                     time.sleep(2 * attempt)
                 
-                # 上传文件
-                result = self.bucket.put_object_from_file(object_key, file_path)
+                # 上传文件；大图分片并发上传，小图单次 PUT
+                if os.path.getsize(file_path) > MULTIPART_THRESHOLD:
+                    result = oss2.resumable_upload(
+                        self.bucket, object_key, file_path,
+                        multipart_threshold=MULTIPART_THRESHOLD,
+                        part_size=MULTIPART_PART_SIZE,
+                        num_threads=MULTIPART_THREADS,
+                        store=self._resumable_store()
+                    )
+                else:
+                    result = self.bucket.put_object_from_file(object_key, file_path)
                 
                 if result.status == 200:
                     logger.info(f"OSS 上传成功: {object_key}")
@@ -150,6 +174,14 @@ class OSSUploader:
         
         return None
     
+    def _resumable_store(self):
+        """断点续传记录放在程序目录的 .cache 下，而不是用户主目录"""
+        if self._store is None:
+            root = os.path.join(_app_dir(), ".cache")
+            os.makedirs(root, exist_ok=True)
+            self._store = oss2.ResumableStore(root=root, dir="oss_checkpoints")
+        return self._store
+    
     def get_direct_link(self, object_key):
         """
         获取文件的公开访问链接
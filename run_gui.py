@@ -0,0 +1,14 @@
+# -*- coding: utf-8 -*-
+"""
+图片处理工具 GUI 启动入口
+
+阶段2 的加文字进程池以 spawn 方式启动子进程（Windows / 打包后的 exe），
+子进程会重新执行入口脚本。入口保持精简，子进程就只导入 image_processor，
+而不会再加载 PySide6 / pandas 以及整个 gui_app。
+"""
+import multiprocessing
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    from gui_app import main
+    main()
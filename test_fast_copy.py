@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+pytest.importorskip("PySide6")
+pytest.importorskip("cv2")
+pytest.importorskip("pandas")
+
+from gui_app import _fast_copy
+
+
+def test_fast_copy_twice_keeps_source(tmp_path):
+    src = tmp_path / "src" / "b.jpg"
+    src.parent.mkdir()
+    src.write_bytes(b"original image bytes")
+    dst = tmp_path / "stage1" / "b.jpg"
+    dst.parent.mkdir()
+
+    _fast_copy(str(src), str(dst))
+    _fast_copy(str(src), str(dst))
+
+    assert src.read_bytes() == b"original image bytes"
+    assert dst.read_bytes() == b"original image bytes"
+    assert not os.path.samefile(src, dst)
+    assert sorted(os.listdir(dst.parent)) == ["b.jpg"]
+
+
+def test_fast_copy_replaces_legacy_hardlink(tmp_path):
+    src = tmp_path / "b.jpg"
+    src.write_bytes(b"original image bytes")
+    dst = tmp_path / "b_stage1.jpg"
+    try:
+        os.link(src, dst)
+    except OSError:
+        pytest.skip("hardlinks not supported")
+
+    _fast_copy(str(src), str(dst))
+    dst.write_bytes(b"edited")
+
+    assert src.read_bytes() == b"original image bytes"
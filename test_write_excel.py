@@ -0,0 +1,23 @@
+import pytest
+
+pd = pytest.importorskip("pandas")
+pytest.importorskip("xlsxwriter")
+pytest.importorskip("openpyxl")
+
+from utils import write_excel
+
+
+def test_write_excel_keeps_every_column(tmp_path):
+    df = pd.DataFrame([
+        {"Folder Name": "a", "Image 1": "http://x/1", "Image 2": "http://x/2"},
+        {"Folder Name": "b", "Image 1": "http://y/1"},
+    ])
+    path = tmp_path / "report.xlsx"
+    write_excel(df, path)
+
+    back = pd.read_excel(path, engine="openpyxl")
+    assert list(back.columns) == ["Folder Name", "Image 1", "Image 2"]
+    assert back["Folder Name"].tolist() == ["a", "b"]
+    assert back["Image 1"].tolist() == ["http://x/1", "http://y/1"]
+    assert back.loc[0, "Image 2"] == "http://x/2"
+    assert pd.isna(back.loc[1, "Image 2"])
@@ -11,15 +11,21 @@ Flow:
 import os
 import re
 import sys
+import json
 import shutil
 import zipfile
 import tempfile
 import subprocess
 import logging
+import time
+import functools
 from dataclasses import dataclass
 
 import requests
-from PySide6.QtCore import QThread, Signal, Qt
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from PySide6.QtCore import QThread, Signal, Qt, QObject, QUrl, QTimer
+from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
 from PySide6.QtWidgets import (
     QDialog,
     QVBoxLayout,
@@ -74,92 +80,214 @@ def get_app_dir() -> str:
     return os.path.dirname(os.path.abspath(__file__))
 
 
-class UpdateCheckWorker(QThread):
-    """Background worker checking latest release."""
+@functools.cache
+def _http_session() -> requests.Session:
+    """Shared keep-alive session for update package downloads.
+
+    Transient failures (connection resets, 429/5xx) are retried with backoff.
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        raise_on_status=False,  # retries exhausted: hand back the last response as before
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _api_headers() -> dict:
+    """Request headers for the GitHub releases API."""
+    headers = {
+        "Accept": "application/vnd.github.v3+json",
+        "User-Agent": "ImageProcessingTool-Updater",
+    }
+    token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _status_error(status_code: int) -> str:
+    """Human readable message for a non-200 releases API response."""
+    if status_code == 403:
+        return "GitHub API rate limit exceeded. Please retry later."
+    if status_code == 404:
+        return "Latest release not found (private repo unauthenticated or no Release)."
+    return f"GitHub API returned status {status_code}"
+
+
+def parse_release(data: dict, current_version: str):
+    """Build ReleaseInfo from a releases/latest payload.
+
+    Returns None when the release is not newer; raises ValueError when the
+    release has no usable .zip asset.
+    """
+    tag = data.get("tag_name", "")
+    remote_ver = tag.lstrip("v")
+
+    if not is_newer(remote_ver, current_version):
+        return None
+
+    assets = data.get("assets", [])
+    download_url = ""
+    asset_name = ""
+    asset_size = 0
+
+    for asset in assets:
+        name = (asset.get("name") or "").lower()
+        if name.endswith(".zip"):
+            download_url = asset.get("browser_download_url", "")
+            asset_name = asset.get("name", "")
+            asset_size = int(asset.get("size") or 0)
+            break
+
+    if not download_url:
+        asset_names = [a.get("name", "") for a in assets]
+        if asset_names:
+            raise ValueError("Release has no .zip asset. Assets: " + ", ".join(asset_names))
+        raise ValueError("Release has no downloadable assets. Please upload a .zip package.")
+
+    return ReleaseInfo(
+        version=remote_ver,
+        download_url=download_url,
+        changelog=(data.get("body", "") or "No changelog provided.").replace("\\n", "\n"),
+        html_url=data.get("html_url", ""),
+        asset_name=asset_name,
+        asset_size=asset_size,
+    )
+
+
+class UpdateChecker(QObject):
+    """Release check on QNetworkAccessManager: async IO on the GUI thread, no QThread.
+
+    Remembers the last ETag so repeated checks are answered with 304 Not Modified;
+    start(max_age=...) can answer from the last response without any request.
+    With cache_path the ETag, body and fetch time are kept on disk, so both
+    survive restarts (the silent check runs once per process).
+    """
 
     update_available = Signal(object)  # ReleaseInfo
     no_update = Signal()
     check_failed = Signal(str)
 
-    def __init__(self, current_version: str, repo: str, parent=None):
+    def __init__(self, current_version: str, repo: str, cache_path=None, parent=None):
         super().__init__(parent)
         self.current_version = current_version
         self.repo = repo
         self.api_url = f"https://api.github.com/repos/{repo}/releases/latest"
-
-    def run(self):
+        self._nam = QNetworkAccessManager(self)
+        self._reply = None
+        self._cache_path = cache_path
+        self._etag = b""
+        self._cached_data = None
+        self._cached_at = None  # time.time() of the last successful response
+        self._load_cache()
+
+    def _load_cache(self):
+        if not self._cache_path:
+            return
         try:
-            headers = {
-                "Accept": "application/vnd.github.v3+json",
-                "User-Agent": "ImageProcessingTool-Updater",
-            }
-            token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN")
-            if token:
-                headers["Authorization"] = f"Bearer {token}"
-
-            resp = requests.get(self.api_url, timeout=10, headers=headers)
-            if resp.status_code == 403:
-                self.check_failed.emit("GitHub API rate limit exceeded. Please retry later.")
-                return
-            if resp.status_code == 404:
-                self.check_failed.emit(
-                    "Latest release not found (private repo unauthenticated or no Release)."
-                )
+            with open(self._cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("url") != self.api_url:
                 return
-            if resp.status_code != 200:
-                self.check_failed.emit(f"GitHub API returned status {resp.status_code}")
-                return
-
-            data = resp.json()
-            tag = data.get("tag_name", "")
-            remote_ver = tag.lstrip("v")
-
-            if not is_newer(remote_ver, self.current_version):
-                self.no_update.emit()
-                return
-
-            assets = data.get("assets", [])
-            download_url = ""
-            asset_name = ""
-            asset_size = 0
-
-            for asset in assets:
-                name = (asset.get("name") or "").lower()
-                if name.endswith(".zip"):
-                    download_url = asset.get("browser_download_url", "")
-                    asset_name = asset.get("name", "")
-                    asset_size = int(asset.get("size") or 0)
-                    break
-
-            if not download_url:
-                asset_names = [a.get("name", "") for a in assets]
-                if asset_names:
-                    self.check_failed.emit(
-                        "Release has no .zip asset. Assets: " + ", ".join(asset_names)
-                    )
+            data, fetched_at = cache["data"], float(cache["fetched_at"])
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            return
+        self._etag = str(cache.get("etag", "")).encode("utf-8")
+        self._cached_data = data
+        self._cached_at = fetched_at
+
+    def _save_cache(self):
+        if not self._cache_path:
+            return
+        cache = {
+            "url": self.api_url,
+            "etag": self._etag.decode("utf-8", "replace"),
+            "data": self._cached_data,
+            "fetched_at": self._cached_at,
+        }
+        try:
+            os.makedirs(os.path.dirname(self._cache_path), exist_ok=True)
+            tmp = f"{self._cache_path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp, self._cache_path)
+        except OSError as e:
+            logger.debug(f"Update cache not saved: {e}")
+
+    def is_running(self) -> bool:
+        return self._reply is not None
+
+    def start(self, max_age: float = 0):
+        """Start a check; a response younger than max_age seconds is replayed without network."""
+        if self._reply is not None:
+            return
+        if (max_age > 0 and self._cached_data is not None
+                and 0 <= time.time() - self._cached_at < max_age):
+            # 异步发出结果，与网络请求时的回调时序一致
+            QTimer.singleShot(0, self._emit_cached)
+            return
+        request = QNetworkRequest(QUrl(self.api_url))
+        for key, value in _api_headers().items():
+            request.setRawHeader(key.encode("ascii"), value.encode("utf-8"))
+        if self._etag and self._cached_data is not None:
+            request.setRawHeader(b"If-None-Match", self._etag)
+        request.setTransferTimeout(10000)
+        self._reply = self._nam.get(request)
+        self._reply.finished.connect(self._on_finished)
+
+    def _on_finished(self):
+        reply, self._reply = self._reply, None
+        reply.deleteLater()
+        try:
+            status = reply.attribute(QNetworkRequest.HttpStatusCodeAttribute)
+            if status is None:
+                if reply.error() in (
+                    QNetworkReply.TimeoutError,
+                    QNetworkReply.OperationCanceledError,
+                ):
+                    self.check_failed.emit("Connection timeout.")
                 else:
-                    self.check_failed.emit(
-                        "Release has no downloadable assets. Please upload a .zip package."
-                    )
+                    self.check_failed.emit("Network unavailable.")
                 return
 
-            info = ReleaseInfo(
-                version=remote_ver,
-                download_url=download_url,
-                changelog=(data.get("body", "") or "No changelog provided.").replace("\\n", "\n"),
-                html_url=data.get("html_url", ""),
-                asset_name=asset_name,
-                asset_size=asset_size,
-            )
-            self.update_available.emit(info)
-
-        except requests.exceptions.ConnectionError:
-            self.check_failed.emit("Network unavailable.")
-        except requests.exceptions.Timeout:
-            self.check_failed.emit("Connection timeout.")
+            status = int(status)
+            if status == 304 and self._cached_data is not None:
+                data = self._cached_data
+            elif status == 200:
+                data = json.loads(bytes(reply.readAll()).decode("utf-8"))
+                self._etag = bytes(reply.rawHeader(b"ETag"))
+                self._cached_data = data
+            else:
+                self.check_failed.emit(_status_error(status))
+                return
+            self._cached_at = time.time()
+            self._save_cache()
+            self._emit_result(data)
+        except ValueError as e:
+            self.check_failed.emit(str(e))
         except Exception as e:
             self.check_failed.emit(f"Update check failed: {e}")
 
+    def _emit_cached(self):
+        try:
+            self._emit_result(self._cached_data)
+        except ValueError as e:
+            self.check_failed.emit(str(e))
+
+    def _emit_result(self, data):
+        info = parse_release(data, self.current_version)
+        if info is None:
+            self.no_update.emit()
+        else:
+            self.update_available.emit(info)
+
 
 class DownloadWorker(QThread):
     """Background ZIP downloader with progress and integrity checks."""
@@ -180,7 +308,7 @@ class DownloadWorker(QThread):
 
     def run(self):
         try:
-            resp = requests.get(
+            resp = _http_session().get(
                 self.url,
                 stream=True,
                 timeout=30,
@@ -275,7 +403,7 @@ if not exist "%SRC_DIR%\\{current_exe}" (
 :EXE_MAP_DONE
 """
     else:
-        restart_cmd = f'start "" "{sys.executable}" "{os.path.join(app_dir, "gui_app.py")}"'
+        restart_cmd = f'start "" "{sys.executable}" "{os.path.join(app_dir, "run_gui.py")}"'
         exe_mapping = ""
 
     script = f'''@echo off
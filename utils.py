@@ -1,7 +1,6 @@
 import os
 from deep_translator import GoogleTranslator
 import logging
-import requests
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +23,42 @@ def ensure_dir(path):
     if not os.path.exists(path):
         os.makedirs(path)
 
+def read_excel(path, **kwargs):
+    """pd.read_excel that prefers the Rust calamine engine, falling back to openpyxl."""
+    import pandas as pd
+    try:
+        return pd.read_excel(path, engine="calamine", **kwargs)
+    except (ImportError, ValueError):
+        # python-calamine 未安装或 pandas 版本过旧时回退 openpyxl
+        return pd.read_excel(path, engine="openpyxl", **kwargs)
+
+def write_excel(df, path):
+    """Write df (without index) to path, streaming rows through xlsxwriter's constant_memory mode.
+
+    constant_memory only accepts writes to the current or a newer row, while
+    df.to_excel emits the body column by column -- so rows are written here
+    directly. Falls back to pandas' default engine when xlsxwriter is missing.
+    """
+    import pandas as pd
+    try:
+        import xlsxwriter
+    except ImportError:
+        df.to_excel(path, index=False)
+        return
+
+    workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+    try:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, [str(c) for c in df.columns])
+        for r, row in enumerate(df.itertuples(index=False, name=None), 1):
+            for c, value in enumerate(row):
+                if pd.isna(value):
+                    continue
+                # numpy 标量转为 Python 原生类型，xlsxwriter 才能按数字/文本写入
+                sheet.write(r, c, value.item() if hasattr(value, "item") else value)
+    finally:
+        workbook.close()
+
 def check_and_download_font(font_path):
     # This is a placeholder. In production, we'd download a Noto Sans JP font.
     # For now, we assume the user puts a valid font there, or we instruct them.